@@ -8,19 +8,38 @@ import json
 import logging
 from typing import Dict, Any, List, Optional
 from src.mcp_tools import mcp_tools
+from src.single_flight import single_flight
+from src.logging_config import log_event
+from src.ranking import event_ranker, parse_preferences
+from src.content_store import content_store
+from src.event_store import content_hash
 
 logger = logging.getLogger(__name__)
 
+# Only the best-ranked events are sent to the LLM for enrichment
+AI_ENRICH_TOP_N = 3
+
+# Fields the LLM adds to each event
+AI_INSIGHT_FIELDS = ("aiInsight", "personalityMatch", "preparationTips")
+
+def event_insight_key(event: Dict[str, Any]) -> str:
+    """Precomputed-content key for an event's insights; changes whenever the event does"""
+    return f"{event.get('id')}:{content_hash(event)}"
+
 class AIOrchestrator:
     """AI Orchestrator that combines LLM with MCP tools"""
     
     def __init__(self):
         self.client = openai.OpenAI()
         self.mcp_tools = mcp_tools
+        self.single_flight = single_flight
+        self.ranker = event_ranker
+        self.content_store = content_store
     
     def generate_idea_with_research(self, prompt: str) -> Dict[str, Any]:
         """
         Generate an idea using AI with optional web research
+        Concurrent requests for the same prompt share one generation
         
         Args:
             prompt: User's input prompt
@@ -28,6 +47,12 @@ class AIOrchestrator:
         Returns:
             Generated idea with title, hook, and CTA
         """
+        # JSON bodies may carry non-string prompts; the fallback idea still handles them
+        key = self.single_flight.make_key("generate_idea", str(prompt).strip())
+        return self.single_flight.do(key, self._generate_idea_with_research, prompt)
+    
+    def _generate_idea_with_research(self, prompt: str) -> Dict[str, Any]:
+        """Uncoalesced idea generation; see generate_idea_with_research"""
         try:
             # First, determine if we need to do research
             research_prompt = f"""
@@ -85,11 +110,12 @@ class AIOrchestrator:
                     "cta": "Get Started"
                 }
             
-            logger.info(f"Generated idea with research for prompt: {prompt}")
+            log_event(logger, logging.INFO, "idea_generated", prompt_chars=len(str(prompt)),
+                      researched=bool(research_context))
             return result
             
         except Exception as e:
-            logger.error(f"Error in AI orchestrator idea generation: {str(e)}")
+            logger.error("Error in AI orchestrator idea generation: %s", e)
             return {
                 "title": "Inspiration Awaits",
                 "hook": "Something amazing is waiting to be discovered. Let's explore new possibilities together!",
@@ -99,6 +125,8 @@ class AIOrchestrator:
     def inspire_with_search(self, query: str) -> Dict[str, Any]:
         """
         Provide inspiration using web search and AI summarization
+        Serves content precomputed off-peak when available; otherwise concurrent
+        requests for the same query share one search and generation
         
         Args:
             query: The topic for inspiration
@@ -106,107 +134,166 @@ class AIOrchestrator:
         Returns:
             Inspirational content with sources
         """
+        query_key = str(query).strip()
+        self.content_store.record_request("inspire", query_key)
+        precomputed = self.content_store.get("inspire", query_key)
+        if precomputed is not None:
+            return precomputed
+        
+        key = self.single_flight.make_key("inspire", query_key)
+        return self.single_flight.do(key, self._inspire_with_search, query)
+    
+    def _inspire_with_search(self, query: str) -> Dict[str, Any]:
+        """Uncoalesced inspiration with a fallback on failure; see inspire_with_search"""
         try:
-            # Perform web search
-            search_results = self.mcp_tools.web_search(query, 5)
-            
-            # Create inspiration using search results
-            inspiration_prompt = f"""
-            Based on these search results about "{query}", create inspiring and motivational content:
-            
-            {json.dumps(search_results, indent=2)}
-            
-            Create content that:
-            - Motivates and uplifts the reader
-            - Provides actionable insights
-            - Is positive and encouraging
-            - References the search findings naturally
-            
-            Keep it engaging and inspiring!
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": inspiration_prompt}],
-                max_tokens=400,
-                temperature=0.7
-            )
-            
-            inspiration_text = response.choices[0].message.content
-            
-            # Include source URLs from search results
-            source_urls = [result.get("url") for result in search_results if result.get("url")]
-            
-            result = {
-                "inspirationText": inspiration_text,
-                "sourceUrl": source_urls[0] if source_urls else None,
-                "additionalSources": source_urls[1:] if len(source_urls) > 1 else []
-            }
-            
-            logger.info(f"Generated inspiration with search for query: {query}")
-            return result
-            
+            return self.generate_inspiration(query)
         except Exception as e:
-            logger.error(f"Error in AI orchestrator inspiration: {str(e)}")
+            logger.error("Error in AI orchestrator inspiration: %s", e)
             return {
                 "inspirationText": f"Every journey begins with a single step. Your interest in {query} shows you're ready to grow and explore new possibilities. Take that first step today!",
                 "sourceUrl": None
             }
     
+    def generate_inspiration(self, query: str) -> Dict[str, Any]:
+        """
+        Generate inspiration for a query; raises on failure instead of falling back
+        
+        Args:
+            query: The topic for inspiration
+            
+        Returns:
+            Inspirational content with sources
+        """
+        # Perform web search
+        search_results = self.mcp_tools.web_search(query, 5)
+        
+        # Create inspiration using search results
+        inspiration_prompt = f"""
+        Based on these search results about "{query}", create inspiring and motivational content:
+        
+        {json.dumps(search_results, indent=2)}
+        
+        Create content that:
+        - Motivates and uplifts the reader
+        - Provides actionable insights
+        - Is positive and encouraging
+        - References the search findings naturally
+        
+        Keep it engaging and inspiring!
+        """
+        
+        response = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": inspiration_prompt}],
+            max_tokens=400,
+            temperature=0.7
+        )
+        
+        inspiration_text = response.choices[0].message.content
+        
+        # Include source URLs from search results
+        source_urls = [result.get("url") for result in search_results if result.get("url")]
+        
+        result = {
+            "inspirationText": inspiration_text,
+            "sourceUrl": source_urls[0] if source_urls else None,
+            "additionalSources": source_urls[1:] if len(source_urls) > 1 else []
+        }
+        
+        log_event(logger, logging.INFO, "inspiration_generated", query_chars=len(str(query)),
+                  sources=len(source_urls))
+        return result
+    
     def analyze_events_with_ai(self, events: List[Dict[str, Any]], user_preferences: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        Analyze and enhance event data using AI
+        Rank events for the user locally, then enhance the top few using AI
         
         Args:
             events: List of event data
             user_preferences: Optional user preferences for personalization
+                (see src.ranking.parse_preferences)
             
         Returns:
-            Enhanced events with AI-generated insights
+            Events in personalized order; the top AI_ENRICH_TOP_N carry AI-generated insights
         """
         try:
             if not events:
                 return events
             
-            # Create AI prompt for event analysis
-            analysis_prompt = f"""
-            Analyze these events and add helpful insights for each:
-            
-            {json.dumps(events, indent=2)}
+            # Vectorized local ranking replaces sending the whole list to the LLM
+            ranked_events = self.ranker.rank_events(events, parse_preferences(user_preferences))
+            top_events = ranked_events[:AI_ENRICH_TOP_N]
             
-            For each event, add:
-            - aiInsight: A brief, helpful insight about why this event might be interesting
-            - personalityMatch: What type of person would enjoy this event
-            - preparationTips: 1-2 quick tips for attending
-            
-            Return the events array with these new fields added.
-            """
+            # Serve insights precomputed off-peak; only the remainder goes to the LLM
+            insights = self.get_precomputed_insights(top_events)
+            missing = [event for event in top_events if event.get("id") not in insights]
+            if missing:
+                insights.update(self.generate_event_insights(missing))
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": analysis_prompt}],
-                max_tokens=800,
-                temperature=0.6
-            )
-            
-            try:
-                enhanced_events = json.loads(response.choices[0].message.content)
-                if isinstance(enhanced_events, list):
-                    logger.info(f"Enhanced {len(enhanced_events)} events with AI insights")
-                    return enhanced_events
-            except:
-                pass
-            
-            # Fallback: return original events
-            return events
+            return [dict(event, **insights.get(event.get("id"), {})) for event in ranked_events]
             
         except Exception as e:
-            logger.error(f"Error in AI event analysis: {str(e)}")
+            logger.error("Error in AI event analysis: %s", e)
             return events
     
+    def get_precomputed_insights(self, events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Stored insights for events whose content has not changed, keyed by event ID"""
+        keys = {event_insight_key(event): event.get("id") for event in events}
+        stored = self.content_store.get_many("event_insight", list(keys))
+        return {keys[key]: insight for key, insight in stored.items()}
+    
+    def generate_event_insights(self, events: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate AI insights for events with one LLM call
+        
+        Args:
+            events: Events to analyze
+            
+        Returns:
+            Insight fields keyed by event ID; empty if the response could not be parsed
+        """
+        # Create AI prompt for event analysis
+        analysis_prompt = f"""
+        Analyze these events and add helpful insights for each:
+        
+        {json.dumps(events, indent=2)}
+        
+        For each event, add:
+        - aiInsight: A brief, helpful insight about why this event might be interesting
+        - personalityMatch: What type of person would enjoy this event
+        - preparationTips: 1-2 quick tips for attending
+        
+        Return the events array with these new fields added.
+        """
+        
+        response = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": analysis_prompt}],
+            max_tokens=800,
+            temperature=0.6
+        )
+        
+        try:
+            enhanced_events = json.loads(response.choices[0].message.content)
+        except:
+            return {}
+        if not isinstance(enhanced_events, list):
+            return {}
+        
+        insights = {
+            event.get("id"): {field: event[field] for field in AI_INSIGHT_FIELDS if field in event}
+            for event in enhanced_events if isinstance(event, dict)
+        }
+        logger.info("Enhanced %d events with AI insights", len(insights))
+        return insights
+    
     def get_tool_definitions(self) -> List[Dict[str, Any]]:
         """Get available MCP tool definitions"""
         return self.mcp_tools.get_available_tools()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request coalescing counters"""
+        return {"single_flight": self.single_flight.stats()}
 
 # Global AI orchestrator instance
 ai_orchestrator = AIOrchestrator()
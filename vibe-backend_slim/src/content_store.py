@@ -0,0 +1,212 @@
+"""
+Precomputed Content Store
+Persists AI content generated ahead of time, request frequencies and
+precomputation spend in SQLite so the request path, in-process scheduler
+and sidecar workers share one view
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between persisting in-memory request counts
+FLUSH_INTERVAL = 30.0
+
+# Request counts not seen within this window are dropped; only they count as popular
+POPULARITY_WINDOW = 7 * 24 * 3600
+
+# Most-requested keys kept per kind; raw user queries are otherwise unbounded
+MAX_TRACKED_REQUESTS = 10000
+
+
+class ContentStore:
+    """SQLite-backed store of precomputed AI content"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), 'database', 'app.db')
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._pending = Counter()
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS precomputed_content (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                );
+                CREATE TABLE IF NOT EXISTS request_frequency (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    hits INTEGER NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_request_frequency_seen ON request_frequency (kind, last_seen);
+                CREATE TABLE IF NOT EXISTS precompute_spend (
+                    day TEXT PRIMARY KEY,
+                    spent_usd REAL NOT NULL
+                );
+                """
+            )
+            self._initialized = True
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """
+        Fetch unexpired precomputed content
+
+        Args:
+            kind: Content kind, e.g. "inspire" or "event_insight"
+            key: Content key within the kind
+
+        Returns:
+            The stored payload, or None on a miss
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT payload FROM precomputed_content WHERE kind = ? AND key = ? AND expires_at > ?",
+                (kind, key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Precomputed content lookup failed: %s", e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, kind: str, keys: List[str]) -> Dict[str, Any]:
+        """Fetch several unexpired payloads of one kind; misses are omitted"""
+        if not keys:
+            return {}
+        try:
+            rows = self._connect().execute(
+                f"SELECT key, payload FROM precomputed_content WHERE kind = ? AND expires_at > ? "
+                f"AND key IN ({', '.join('?' * len(keys))})",
+                [kind, time.time()] + list(keys)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Precomputed content lookup failed: %s", e)
+            return {}
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def put(self, kind: str, key: str, payload: Any, ttl: float):
+        """Store content that stays servable for ttl seconds"""
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO precomputed_content (kind, key, payload, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (kind, key, json.dumps(payload), now, now + ttl)
+        )
+
+    def fresh_keys(self, kind: str, min_remaining: float) -> set:
+        """Keys of a kind that stay servable for at least min_remaining seconds"""
+        rows = self._connect().execute(
+            "SELECT key FROM precomputed_content WHERE kind = ? AND expires_at > ?",
+            (kind, time.time() + min_remaining)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def record_request(self, kind: str, key: str):
+        """Count a request in memory; counts are persisted every FLUSH_INTERVAL seconds"""
+        with self._pending_lock:
+            self._pending[(kind, key)] += 1
+            due = time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            try:
+                self.flush_requests()
+            except sqlite3.Error as e:
+                logger.warning("Failed to persist request frequencies: %s", e)
+
+    def flush_requests(self):
+        """Persist in-memory request counts and drop stale or least-requested keys"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO request_frequency (kind, key, hits, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(kind, key) DO UPDATE SET hits = hits + excluded.hits, last_seen = excluded.last_seen",
+                [(kind, key, hits, now) for (kind, key), hits in pending.items()]
+            )
+            conn.execute("DELETE FROM request_frequency WHERE last_seen <= ?", (now - POPULARITY_WINDOW,))
+            for kind in {kind for kind, _ in pending}:
+                conn.execute(
+                    "DELETE FROM request_frequency WHERE kind = ? AND key NOT IN ("
+                    "SELECT key FROM request_frequency WHERE kind = ? ORDER BY hits DESC, last_seen DESC LIMIT ?)",
+                    (kind, kind, MAX_TRACKED_REQUESTS)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def popular(self, kind: str, limit: int, since: float) -> List[Tuple[str, int]]:
+        """Most requested keys of a kind seen after the given timestamp"""
+        return [tuple(row) for row in self._connect().execute(
+            "SELECT key, hits FROM request_frequency WHERE kind = ? AND last_seen > ? ORDER BY hits DESC LIMIT ?",
+            (kind, since, limit)
+        ).fetchall()]
+
+    def reserve_spend(self, amount_usd: float, budget_usd: float) -> bool:
+        """
+        Atomically reserve part of today's precomputation budget
+
+        Returns:
+            True if the amount fit within the budget and was recorded
+        """
+        day = time.strftime("%Y-%m-%d")
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT spent_usd FROM precompute_spend WHERE day = ?", (day,)).fetchone()
+            spent = row[0] if row else 0.0
+            if spent + amount_usd > budget_usd:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO precompute_spend (day, spent_usd) VALUES (?, ?)",
+                (day, spent + amount_usd)
+            )
+            return True
+        finally:
+            conn.execute("COMMIT")
+
+    def spent_today(self) -> float:
+        """Precomputation spend recorded today"""
+        row = self._connect().execute(
+            "SELECT spent_usd FROM precompute_spend WHERE day = ?", (time.strftime("%Y-%m-%d"),)
+        ).fetchone()
+        return row[0] if row else 0.0
+
+
+# Global content store instance
+content_store = ContentStore(db_path=os.getenv('VIBE_CONTENT_DB'))
@@ -0,0 +1,128 @@
+"""
+Event Payload Cache
+Keeps pre-serialized JSON fragments for each event's list and detail views,
+rebuilt only when the event's content hash changes
+List responses are assembled by concatenating fragments
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.event_store import EventStore, event_store
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+# Part of every event ETag; bump whenever the serialized payloads change shape or
+# content (fields, EVENT_DETAIL_DEFAULTS, FULL_DESCRIPTION_SUFFIX, fragment format)
+PAYLOAD_FORMAT_VERSION = 1
+
+# Static fields added to every event detail view
+EVENT_DETAIL_DEFAULTS = {
+    "organizer": "Community Events Team",
+    "contact": "events@community.org",
+    "capacity": "50 people",
+    "requirements": "None - all skill levels welcome"
+}
+
+FULL_DESCRIPTION_SUFFIX = (
+    " This event is perfect for families and individuals looking to engage with their community."
+    " Registration is recommended but not required."
+)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize to compact JSON bytes with sorted keys, matching Flask's jsonify output"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def build_event_details(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand an event into its detail view"""
+    detailed_event = dict(event)
+    detailed_event["fullDescription"] = f"{event['description']}{FULL_DESCRIPTION_SUFFIX}"
+    detailed_event.update(EVENT_DETAIL_DEFAULTS)
+    return detailed_event
+
+
+class EventPayloadCache:
+    """LRU cache of serialized event fragments keyed by event ID and content hash"""
+
+    def __init__(self, store: EventStore, max_entries: int = 50000):
+        self.store = store
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, bytes, Optional[bytes]]]" = OrderedDict()
+
+    def _lookup(self, event_id: str, content_hash: str) -> Optional[Tuple[str, bytes, Optional[bytes]]]:
+        with self._lock:
+            entry = self._entries.get(event_id)
+            if entry is None or entry[0] != content_hash:
+                return None
+            self._entries.move_to_end(event_id)
+            return entry
+
+    def _store(self, event_id: str, entry: Tuple[str, bytes, Optional[bytes]]):
+        with self._lock:
+            self._entries[event_id] = entry
+            self._entries.move_to_end(event_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def list_body(self, keys: List[Tuple[str, str]]) -> bytes:
+        """
+        Build a JSON array of list-view events
+
+        Args:
+            keys: (event ID, content hash) pairs in response order
+
+        Returns:
+            The serialized array
+        """
+        fragments: List[Optional[bytes]] = []
+        missing = []
+        for event_id, content_hash in keys:
+            entry = self._lookup(event_id, content_hash)
+            fragments.append(entry[1] if entry else None)
+            if entry is None:
+                missing.append(event_id)
+
+        if missing:
+            found = self.store.get_events_by_ids(missing)
+            for index, (event_id, _) in enumerate(keys):
+                if fragments[index] is None and event_id in found:
+                    event, content_hash = found[event_id]
+                    fragment = dumps(event)
+                    self._store(event_id, (content_hash, fragment, None))
+                    fragments[index] = fragment
+
+        return b"[" + b",".join(fragment for fragment in fragments if fragment is not None) + b"]"
+
+    def detail_body(self, event_id: str, content_hash: str) -> Optional[bytes]:
+        """
+        Serialized detail view of one event
+
+        Returns:
+            The serialized object, or None if the event no longer exists
+        """
+        entry = self._lookup(event_id, content_hash)
+        if entry is not None and entry[2] is not None:
+            return entry[2]
+
+        found = self.store.get_events_by_ids([event_id])
+        if event_id not in found:
+            return None
+        event, current_hash = found[event_id]
+        fragment = entry[1] if entry is not None and current_hash == content_hash else dumps(event)
+        detail = dumps(build_event_details(event))
+        self._store(event_id, (current_hash, fragment, detail))
+        return detail
+
+
+# Global payload cache instance
+event_payloads = EventPayloadCache(event_store)
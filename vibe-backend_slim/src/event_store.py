@@ -0,0 +1,238 @@
+"""
+Event Store
+SQLite-backed catalog of events served by the realtime routes
+Supports batched upserts with content hashes so unchanged rows are skipped
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Public event schema, in API (camelCase) naming
+EVENT_FIELDS = ("id", "category", "time", "hour", "title", "description", "location", "price", "imageUrl")
+
+# Matching SQLite column names
+_COLUMNS = ("id", "category", "time", "hour", "title", "description", "location", "price", "image_url")
+
+
+def content_hash(event: Dict[str, Any]) -> str:
+    """Stable hash over the public fields of a normalized event"""
+    raw = json.dumps([event.get(field) for field in EVENT_FIELDS], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class EventStore:
+    """Event catalog stored in SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), 'database', 'app.db')
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection in WAL mode so imports do not block readers"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    id TEXT PRIMARY KEY,
+                    category TEXT NOT NULL,
+                    time TEXT,
+                    hour TEXT,
+                    title TEXT,
+                    description TEXT,
+                    location TEXT,
+                    price TEXT,
+                    image_url TEXT,
+                    content_hash TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    starts_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_events_category ON events (category COLLATE NOCASE);
+                CREATE TABLE IF NOT EXISTS catalog_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0);
+                """
+            )
+            # Catalogs created before start times were stored lack the column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if "starts_at" not in columns:
+                conn.execute("ALTER TABLE events ADD COLUMN starts_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_starts_at ON events (starts_at)")
+            self._initialized = True
+
+    @staticmethod
+    def _row_to_event(row: sqlite3.Row) -> Dict[str, Any]:
+        return {field: row[column] for field, column in zip(EVENT_FIELDS, _COLUMNS)}
+
+    def version(self) -> int:
+        """Catalog version; incremented whenever an upsert changes at least one row"""
+        row = self._connect().execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def count(self) -> int:
+        """Number of events in the catalog"""
+        return self._connect().execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    @staticmethod
+    def _list_query(columns: str, categories: Optional[List[str]], limit: Optional[int]) -> Tuple[str, List[Any]]:
+        query = f"SELECT {columns} FROM events"
+        params: List[Any] = []
+        if categories:
+            query += f" WHERE category COLLATE NOCASE IN ({', '.join('?' * len(categories))})"
+            params.extend(categories)
+        query += " ORDER BY rowid"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+
+    def list_events(self, category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List events in catalog order
+
+        Args:
+            category: Optional case-insensitive category filter
+            limit: Optional maximum number of events
+
+        Returns:
+            List of event dicts
+        """
+        query, params = self._list_query(', '.join(_COLUMNS), [category] if category else None, limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    def list_event_keys(self, category: Optional[str] = None, limit: Optional[int] = None,
+                        categories: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """
+        Like list_events, but return only (id, content_hash) pairs
+        Lets callers reuse cached representations of unchanged events
+
+        Args:
+            categories: Alternative to category matching any of several categories
+        """
+        query, params = self._list_query("id, content_hash", [category] if category else categories, limit)
+        return [tuple(row) for row in self._connect().execute(query, params).fetchall()]
+
+    def list_upcoming(self, limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        List events that have not started yet, soonest first
+
+        Events without a known start time follow the dated ones, in catalog order.
+
+        Args:
+            limit: Maximum number of events
+            now: Reference timestamp (default: current time)
+        """
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM events WHERE starts_at IS NULL OR starts_at >= ? "
+            "ORDER BY starts_at IS NULL, starts_at, rowid LIMIT ?",
+            (time.time() if now is None else now, limit)
+        ).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    def get_event_key(self, event_id: str) -> Optional[str]:
+        """Content hash of a single event, or None if not found"""
+        row = self._connect().execute("SELECT content_hash FROM events WHERE id = ?", (event_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_events_by_ids(self, event_ids: List[str]) -> Dict[str, Tuple[Dict[str, Any], str]]:
+        """
+        Fetch several events at once
+
+        Args:
+            event_ids: Event IDs to look up
+
+        Returns:
+            Mapping of event ID to (event, content_hash) for the IDs that exist
+        """
+        found = {}
+        conn = self._connect()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(event_ids), 500):
+            chunk = event_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)}, content_hash FROM events WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                found[row["id"]] = (self._row_to_event(row), row["content_hash"])
+        return found
+
+    def upsert_many(self, events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Insert or update a batch of normalized events in one transaction
+        Rows whose content hash is unchanged are left untouched
+
+        Args:
+            events: Normalized event dicts (see EVENT_FIELDS), optionally carrying a
+                startsAt epoch timestamp used to order upcoming events
+
+        Returns:
+            Counts of rows received, written and skipped
+        """
+        now = time.time()
+        rows = [
+            tuple(event.get(field) for field in EVENT_FIELDS) + (content_hash(event), now, event.get("startsAt"))
+            for event in events
+        ]
+        if not rows:
+            return {"received": 0, "written": 0, "skipped": 0}
+
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+        sql = (
+            f"INSERT INTO events ({', '.join(_COLUMNS)}, content_hash, updated_at, starts_at) "
+            f"VALUES ({', '.join('?' * (len(_COLUMNS) + 3))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}, "
+            "content_hash = excluded.content_hash, updated_at = excluded.updated_at, starts_at = excluded.starts_at "
+            "WHERE events.content_hash != excluded.content_hash OR events.starts_at IS NOT excluded.starts_at"
+        )
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(sql, rows)
+            written = conn.total_changes - before
+            if written:
+                conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return {"received": len(rows), "written": written, "skipped": len(rows) - written}
+
+    def seed(self, events: List[Dict[str, Any]]):
+        """Populate an empty catalog with initial events"""
+        if self.count() == 0:
+            result = self.upsert_many(events)
+            logger.info("Seeded event catalog with %d events", result["written"])
+
+
+# Global event store instance
+event_store = EventStore(db_path=os.getenv('VIBE_EVENTS_DB'))
@@ -0,0 +1,406 @@
+"""
+Event Ingestion
+Stream-parses CSV, JSONL and iCalendar feeds in constant memory,
+normalizes records to the event schema and upserts them into the event store in batches
+
+Usage:
+    python -m src.ingest events.csv [--format csv|jsonl|ics] [--batch-size 5000]
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, TextIO
+
+from src.event_store import EventStore, event_store
+from src.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Larger requested batch sizes are clamped to this
+MAX_BATCH_SIZE = 50000
+
+# Category given to records whose feed does not categorize them
+DEFAULT_CATEGORY = "Other"
+
+FORMATS = ("csv", "jsonl", "ics")
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".ics": "ics",
+    ".ical": "ics",
+}
+
+# Accepted source field names for each event field, in priority order
+_ALIASES = {
+    "id": ("id", "event_id", "eventId", "uid"),
+    "category": ("category", "categories", "type"),
+    "time": ("time", "day", "date", "when"),
+    "hour": ("hour", "start_time", "startTime"),
+    "title": ("title", "name", "summary"),
+    "description": ("description", "details"),
+    "location": ("location", "venue", "address"),
+    "price": ("price", "cost", "fee"),
+    "imageUrl": ("imageUrl", "image_url", "image"),
+}
+
+_START_ALIASES = ("start", "starts_at", "startsAt", "dtstart", "datetime")
+
+
+def detect_format(path: str) -> str:
+    """Infer the feed format from a file extension"""
+    fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot infer format for {path}; pass one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def iter_csv(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per CSV row"""
+    yield from csv.DictReader(fp)
+
+
+def iter_jsonl(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per non-empty JSON line; malformed lines yield None"""
+    for line in fp:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def _unfold(fp: TextIO) -> Iterator[str]:
+    """Join RFC 5545 folded continuation lines"""
+    pending = None
+    for line in fp:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+
+def _ical_unescape(value: str) -> str:
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def iter_ics(fp: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per VEVENT, keyed by lower-cased property name"""
+    record = None
+    for line in _unfold(fp):
+        if line == "BEGIN:VEVENT":
+            record = {}
+        elif line == "END:VEVENT":
+            if record is not None:
+                yield record
+            record = None
+        elif record is not None and ":" in line:
+            name, value = line.split(":", 1)
+            name = name.split(";", 1)[0].lower()
+            record.setdefault(name, _ical_unescape(value))
+
+
+_PARSERS = {"csv": iter_csv, "jsonl": iter_jsonl, "ics": iter_ics}
+
+
+def _parse_start(value: str) -> Optional[datetime]:
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    # Basic-format iCalendar timestamps that fromisoformat may not accept
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def _format_hour(value: datetime) -> str:
+    return value.strftime("%I:%M %p").lstrip("0")
+
+
+_HOUR_24 = re.compile(r"^(\d{1,2}):(\d{2})$")
+_NUMBER = re.compile(r"^\d+(\.\d+)?$")
+
+
+def _normalize_hour(value: str) -> str:
+    match = _HOUR_24.match(value)
+    if match and int(match.group(1)) < 24:
+        return _format_hour(datetime(2000, 1, 1, int(match.group(1)), int(match.group(2))))
+    return value
+
+
+def _normalize_price(value: Any) -> Optional[str]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "Free" if value == 0 else f"${value:g}"
+    value = str(value).strip()
+    if not value:
+        return None
+    if _NUMBER.match(value):
+        return _normalize_price(float(value))
+    if value.lower() in ("$0", "free"):
+        return "Free"
+    return value
+
+
+def _pick(record: Dict[str, Any], names) -> Any:
+    for name in names:
+        value = record.get(name)
+        if isinstance(value, (list, tuple)):
+            # JSONL arrays such as "category": ["Art", "Music"] use their first entry
+            value = next((item for item in value if item not in (None, "")), None)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_event(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map a raw feed record onto the event schema
+
+    Args:
+        record: Raw record from any supported parser
+
+    Returns:
+        Normalized event (plus a startsAt timestamp, or None if the start is
+        unknown), or None if the record lacks a title
+    """
+    if not record:
+        return None
+    event = {field: _pick(record, names) for field, names in _ALIASES.items()}
+    if not event["title"]:
+        return None
+
+    start = _pick(record, _START_ALIASES)
+    start = _parse_start(str(start)) if start else None
+    event["startsAt"] = None
+    if start is not None:
+        try:
+            # Naive start times are taken as server-local
+            event["startsAt"] = start.timestamp()
+        except (OverflowError, OSError, ValueError):
+            pass
+        if not event["time"]:
+            event["time"] = start.strftime("%A, %b %d").replace(" 0", " ")
+        if not event["hour"] and (start.hour or start.minute):
+            event["hour"] = _format_hour(start)
+
+    category = str(event["category"] or "").split(",")[0].strip() or DEFAULT_CATEGORY
+    event["category"] = category[:1].upper() + category[1:]
+    # An unknown price stays None rather than being presented (and ranked) as free
+    if event["price"] is not None:
+        event["price"] = _normalize_price(event["price"])
+    if event["hour"]:
+        event["hour"] = _normalize_hour(str(event["hour"]).strip())
+    for field in ("time", "title", "description", "location"):
+        if event[field] is not None:
+            event[field] = str(event[field]).strip()
+
+    if not event["id"]:
+        # Derive a stable ID so re-importing the same feed updates rather than duplicates
+        key = "|".join(str(event[field] or "") for field in ("title", "time", "hour", "location"))
+        event["id"] = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    event["id"] = str(event["id"])
+    return event
+
+
+def check_batch_size(batch_size: int) -> int:
+    """
+    Validate a requested batch size
+
+    Returns:
+        The batch size, clamped to MAX_BATCH_SIZE
+
+    Raises:
+        ValueError: If the batch size is below 1
+    """
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1")
+    return min(batch_size, MAX_BATCH_SIZE)
+
+
+def ingest_stream(fp: TextIO, fmt: str, store: EventStore = event_store,
+                  batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Stream records from an open text file into the event store
+
+    Args:
+        fp: Text stream positioned at the start of the feed
+        fmt: One of FORMATS
+        store: Destination event store
+        batch_size: Number of events per upsert transaction (clamped to MAX_BATCH_SIZE)
+        progress: Optional dict updated in place with running counts
+
+    Returns:
+        Import statistics
+    """
+    if fmt not in _PARSERS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    batch_size = check_batch_size(batch_size)
+
+    stats = progress if progress is not None else {}
+    stats.update({"read": 0, "invalid": 0, "written": 0, "skipped": 0, "batches": 0})
+    started = time.monotonic()
+
+    batch = {}
+    for record in _PARSERS[fmt](fp):
+        stats["read"] += 1
+        event = normalize_event(record)
+        if event is None:
+            stats["invalid"] += 1
+            continue
+        # Last occurrence of an ID within a batch wins
+        batch[event["id"]] = event
+        if len(batch) >= batch_size:
+            _flush(store, batch, stats)
+
+    if batch:
+        _flush(store, batch, stats)
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    return stats
+
+
+def _flush(store: EventStore, batch: Dict[str, Dict[str, Any]], stats: Dict[str, Any]):
+    result = store.upsert_many(batch.values())
+    stats["written"] += result["written"]
+    stats["skipped"] += result["skipped"]
+    stats["batches"] += 1
+    batch.clear()
+
+
+def ingest_file(path: str, fmt: Optional[str] = None, store: EventStore = event_store,
+                batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Import a feed file into the event store
+
+    Args:
+        path: Path to a CSV, JSONL or iCalendar file
+        fmt: Optional format; inferred from the extension if omitted
+
+    Returns:
+        Import statistics
+    """
+    fmt = fmt or detect_format(path)
+    with io.open(path, "r", encoding="utf-8-sig", newline="") as fp:
+        stats = ingest_stream(fp, fmt, store=store, batch_size=batch_size, progress=progress)
+    logger.info("Imported %s: %s", os.path.basename(path), stats)
+    return stats
+
+
+# Background import jobs started from the admin API
+# Finished jobs are kept for JOB_TTL seconds, and at most MAX_FINISHED_JOBS of them
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 100
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+
+def _evict_jobs():
+    """Drop expired and excess finished jobs; callers hold _jobs_lock"""
+    finished = sorted(
+        (job for job in _jobs.values() if "finishedAt" in job), key=lambda job: job["finishedAt"], reverse=True
+    )
+    cutoff = time.time() - JOB_TTL
+    for index, job in enumerate(finished):
+        if index >= MAX_FINISHED_JOBS or job["finishedAt"] < cutoff:
+            del _jobs[job["id"]]
+
+
+def start_import_job(path: str, fmt: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                     delete_after: bool = False) -> Dict[str, Any]:
+    """
+    Import a feed on a background thread so serving is not blocked
+
+    Args:
+        path: Path to the feed file
+        fmt: Optional format; inferred from the extension if omitted
+        batch_size: Number of events per upsert transaction
+        delete_after: Remove the file once the import finishes (used for uploads)
+
+    Returns:
+        The job record, updated in place as the import progresses
+    """
+    fmt = fmt or detect_format(path)
+    batch_size = check_batch_size(batch_size)
+    job = {"id": uuid.uuid4().hex, "format": fmt, "status": "running", "startedAt": time.time(), "stats": {}}
+    with _jobs_lock:
+        _evict_jobs()
+        _jobs[job["id"]] = job
+
+    def run():
+        try:
+            ingest_file(path, fmt, batch_size=batch_size, progress=job["stats"])
+            job["status"] = "completed"
+        except Exception as e:
+            logger.error("Event import %s failed: %s", job["id"], e)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finishedAt"] = time.time()
+            if delete_after:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    threading.Thread(target=run, name=f"event-import-{job['id'][:8]}", daemon=True).start()
+    return job
+
+
+def get_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Look up a background import job"""
+    with _jobs_lock:
+        _evict_jobs()
+        return _jobs.get(job_id)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import events from CSV, JSONL or iCalendar feeds")
+    parser.add_argument("path", help="Feed file to import")
+    parser.add_argument("--format", choices=FORMATS, help="Feed format (default: inferred from extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Events per transaction")
+    parser.add_argument("--db", help="Event store database path (default: src/database/app.db)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    store = EventStore(args.db) if args.db else event_store
+    try:
+        stats = ingest_file(args.path, args.format, store=store, batch_size=args.batch_size)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Logging Configuration
+Central, non-blocking, structured logging for the backend
+- Records are handed to a bounded queue and written by a background listener thread
+- Messages are formatted lazily, as JSON, only once a record is actually written
+- Low-severity records are sampled per route and capped per request
+- Large payloads are truncated and per-record overhead is measured
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional
+
+try:
+    from flask import g, has_request_context, request
+except ImportError:  # the ingestion CLI can run without Flask
+    has_request_context = None
+
+# Fraction of sub-WARNING records kept per route rule; unlisted routes keep everything
+DEFAULT_SAMPLE_RATES = {
+    "/api/realtime/events": 0.1,
+    "/api/realtime/events/<event_id>": 0.1,
+}
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse "rule=rate,rule=rate" into a mapping"""
+    rates = {}
+    for item in (value or "").split(","):
+        rule, _, rate = item.strip().rpartition("=")
+        if not rule:
+            continue
+        try:
+            rates[rule] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def truncate(value: Any, limit: int) -> Any:
+    """Shorten long strings, marking how much was cut"""
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}...(+{len(value) - limit} chars)"
+    return value
+
+
+def redact_email(email: Optional[str]) -> Optional[str]:
+    """Keep only the first character of the local part and the domain"""
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().partition("@")
+    return f"{local[:1]}***@{domain}"
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields):
+    """
+    Emit a structured record; fields are serialized only if the record is written
+
+    Args:
+        logger: Destination logger
+        level: Logging level
+        event: Short, stable event name
+        **fields: Structured context attached to the record
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+class JSONFormatter(logging.Formatter):
+    """Render records as single-line JSON with truncated payloads"""
+
+    def __init__(self, max_field_chars: int = 512):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": truncate(record.getMessage(), self.max_field_chars),
+        }
+        route = getattr(record, "route", None)
+        if route:
+            payload["route"] = route
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update({key: truncate(value, self.max_field_chars) for key, value in fields.items()})
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and key not in ("fields", "route"):
+                payload[key] = truncate(value, self.max_field_chars)
+        if record.exc_info:
+            payload["exc"] = truncate(self.formatException(record.exc_info), self.max_field_chars * 8)
+        return json.dumps(payload, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the request thread
+    Samples and caps low-severity records per request, drops records when the
+    queue is full, and leaves message formatting to the listener thread
+    """
+
+    def __init__(self, log_queue: queue.Queue, sample_rates: Dict[str, float], max_per_request: int):
+        super().__init__(log_queue)
+        self.sample_rates = sample_rates
+        self.max_per_request = max_per_request
+        self._lock = threading.Lock()
+        self._stats = {
+            "handled": 0,
+            "enqueued": 0,
+            "dropped_queue_full": 0,
+            "dropped_per_request_cap": 0,
+            "sampled_out": 0,
+            "overhead_ns_total": 0,
+            "overhead_ns_max": 0,
+        }
+
+    def _count(self, key: str, elapsed_ns: int = 0):
+        with self._lock:
+            self._stats[key] += 1
+            self._stats["handled"] += 1
+            self._stats["overhead_ns_total"] += elapsed_ns
+            if elapsed_ns > self._stats["overhead_ns_max"]:
+                self._stats["overhead_ns_max"] = elapsed_ns
+
+    def _admit(self, record: logging.LogRecord) -> Optional[str]:
+        """Attach request context; return a drop reason or None to keep the record"""
+        if has_request_context is None or not has_request_context():
+            return None
+        rule = request.url_rule.rule if request.url_rule else request.path
+        record.route = rule
+        if record.levelno >= logging.WARNING:
+            return None
+
+        # One sampling decision per request keeps a request's records together
+        sampled = getattr(g, "_log_sampled", None)
+        if sampled is None:
+            sampled = random.random() < self.sample_rates.get(rule, 1.0)
+            g._log_sampled = sampled
+        if not sampled:
+            return "sampled_out"
+
+        emitted = getattr(g, "_log_count", 0)
+        if emitted >= self.max_per_request:
+            return "dropped_per_request_cap"
+        g._log_count = emitted + 1
+        return None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record need not be pre-formatted
+        return copy.copy(record)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if not self.filter(record):
+            return False
+        started = time.perf_counter_ns()
+        reason = self._admit(record)
+        if reason is None:
+            try:
+                self.queue.put_nowait(self.prepare(record))
+                reason = "enqueued"
+            except queue.Full:
+                reason = "dropped_queue_full"
+        self._count(reason, time.perf_counter_ns() - started)
+        return reason == "enqueued"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self.queue.qsize()
+        stats["overhead_ns_avg"] = stats["overhead_ns_total"] // stats["handled"] if stats["handled"] else 0
+        return stats
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging() -> NonBlockingQueueHandler:
+    """
+    Install the queue-based JSON logging pipeline on the root logger (idempotent)
+
+    Environment:
+        VIBE_LOG_LEVEL: Root level (default INFO)
+        VIBE_LOG_QUEUE_SIZE: Maximum queued records before dropping (default 10000)
+        VIBE_LOG_MAX_FIELD_CHARS: Truncation limit for messages and fields (default 512)
+        VIBE_LOG_MAX_PER_REQUEST: Sub-WARNING records kept per request (default 50)
+        VIBE_LOG_SAMPLE_RATES: Per-route overrides, e.g. "/api/ai/inspire=0.5"
+
+    Returns:
+        The installed queue handler
+    """
+    global _handler, _listener
+    with _configure_lock:
+        if _handler is not None:
+            return _handler
+
+        sample_rates = dict(DEFAULT_SAMPLE_RATES)
+        sample_rates.update(parse_sample_rates(os.getenv("VIBE_LOG_SAMPLE_RATES")))
+
+        log_queue = queue.Queue(maxsize=_env_int("VIBE_LOG_QUEUE_SIZE", 10000))
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JSONFormatter(_env_int("VIBE_LOG_MAX_FIELD_CHARS", 512)))
+
+        _handler = NonBlockingQueueHandler(log_queue, sample_rates, _env_int("VIBE_LOG_MAX_PER_REQUEST", 50))
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        root.setLevel(os.getenv("VIBE_LOG_LEVEL", "INFO").upper())
+        return _handler
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Counters and per-record overhead of the logging pipeline"""
+    return _handler.stats() if _handler is not None else {"configured": False}
@@ -5,11 +5,19 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS
+from src.logging_config import configure_logging
+
+# Configure logging once, before importing modules that log at import time
+configure_logging()
+
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.ai import ai_bp
 from src.routes.realtime import realtime_bp
 from src.routes.ops import ops_bp
+from src.routes.admin import admin_bp
+from src.routes.batch import batch_bp
+from src.profiling import request_profiler
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -17,11 +25,16 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 # Enable CORS for all routes
 CORS(app)
 
+# Opt-in request profiling (VIBE_PROFILING=1); registers no hooks otherwise
+request_profiler.init_app(app)
+
 # Register blueprints
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(ai_bp, url_prefix='/api/ai')
 app.register_blueprint(realtime_bp, url_prefix='/api/realtime')
 app.register_blueprint(ops_bp, url_prefix='/api/ops')
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+app.register_blueprint(batch_bp, url_prefix='/api')
 
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
@@ -30,6 +43,11 @@ db.init_app(app)
 with app.app_context():
     db.create_all()
 
+# Optional in-process precomputation of AI content; alternatively run `python -m src.precompute`
+if os.getenv('VIBE_PRECOMPUTE') == '1':
+    from src.precompute import precompute_scheduler
+    precompute_scheduler.start()
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -35,10 +35,10 @@ class MCPTools:
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            logger.error(f"HTTP GET request failed: {str(e)}")
+            logger.error("HTTP GET request failed: %s", e)
             return {"error": f"HTTP request failed: {str(e)}"}
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON response: {str(e)}")
+            logger.error("Failed to decode JSON response: %s", e)
             return {"error": f"Invalid JSON response: {str(e)}"}
     
     def web_search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
@@ -76,7 +76,7 @@ class MCPTools:
             }
         ]
         
-        logger.info(f"Web search performed for query: {query}")
+        logger.debug("Web search performed for query: %s", query)
         return mock_results[:num_results]
     
     def db_query(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
@@ -99,11 +99,12 @@ class MCPTools:
             results = [dict(row) for row in cursor.fetchall()]
             
             conn.close()
-            logger.info(f"Database query executed successfully: {query}")
+            # SQL text only at DEBUG; the formatter truncates it
+            logger.debug("Database query executed successfully (%d rows): %s", len(results), query)
             return results
             
         except sqlite3.Error as e:
-            logger.error(f"Database query failed: {str(e)}")
+            logger.error("Database query failed: %s", e)
             return [{"error": f"Database query failed: {str(e)}"}]
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
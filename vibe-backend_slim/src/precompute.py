@@ -0,0 +1,228 @@
+"""
+AI Content Precomputation
+Background scheduler that pre-generates inspiration for popular queries and
+insights for upcoming catalog events during off-peak hours, within a daily
+spend budget, into the precomputed content store
+
+Runs in-process (VIBE_PRECOMPUTE=1) or as a sidecar:
+    python -m src.precompute [--once] [--force]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from src.ai_orchestrator import AI_ENRICH_TOP_N, ai_orchestrator, event_insight_key
+from src.content_store import POPULARITY_WINDOW, content_store
+from src.event_store import event_store
+from src.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OFF_PEAK_HOURS = "0-6"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def parse_hours(value: str) -> Optional[set]:
+    """
+    Parse off-peak hours such as "0-6" or "1-5,22-2"; "*" means always
+
+    Ranges are inclusive of both ends and wrap past midnight when the start
+    is after the end, so "22-2" covers 22, 23, 0, 1 and 2.
+
+    Returns:
+        Set of hours (0-23), or None for always
+
+    Raises:
+        ValueError: If a part is not an hour or hour range
+    """
+    if value.strip() == "*":
+        return None
+    hours = set()
+    for part in value.split(","):
+        start, _, end = part.strip().partition("-")
+        if not start:
+            continue
+        first = int(start) % 24
+        last = int(end) % 24 if end else first
+        span = (last - first) % 24
+        hours.update((first + offset) % 24 for offset in range(span + 1))
+    return hours
+
+
+class PrecomputeScheduler:
+    """Periodically refreshes precomputed AI content"""
+
+    def __init__(self, orchestrator=ai_orchestrator, store=content_store, events=event_store):
+        """
+        Environment:
+            VIBE_PRECOMPUTE_INTERVAL: Seconds between runs (default 300)
+            VIBE_PRECOMPUTE_OFFPEAK_HOURS: Local hours to run in, e.g. "0-6" (default); "*" for always
+            VIBE_PRECOMPUTE_DAILY_BUDGET_USD: Maximum daily precomputation spend (default 1.0)
+            VIBE_PRECOMPUTE_COST_PER_CALL_USD: Estimated cost of one LLM call (default 0.002)
+            VIBE_PRECOMPUTE_TTL: Seconds precomputed content stays servable (default 86400)
+            VIBE_PRECOMPUTE_TOP_QUERIES: Popular queries to keep warm (default 50)
+            VIBE_PRECOMPUTE_EVENTS: Upcoming events to keep enriched, soonest first (default 60)
+            VIBE_PRECOMPUTE_RETRY_AFTER: Seconds before a failed query or event is retried (default 3600)
+        """
+        self.orchestrator = orchestrator
+        self.store = store
+        self.events = events
+        self.interval = _env_float("VIBE_PRECOMPUTE_INTERVAL", 300)
+        self.off_peak_hours = self._off_peak_hours(os.getenv("VIBE_PRECOMPUTE_OFFPEAK_HOURS", DEFAULT_OFF_PEAK_HOURS))
+        self.daily_budget = _env_float("VIBE_PRECOMPUTE_DAILY_BUDGET_USD", 1.0)
+        self.cost_per_call = _env_float("VIBE_PRECOMPUTE_COST_PER_CALL_USD", 0.002)
+        self.ttl = _env_float("VIBE_PRECOMPUTE_TTL", 86400)
+        self.top_queries = int(_env_float("VIBE_PRECOMPUTE_TOP_QUERIES", 50))
+        self.upcoming_events = int(_env_float("VIBE_PRECOMPUTE_EVENTS", 60))
+        self.retry_after = _env_float("VIBE_PRECOMPUTE_RETRY_AFTER", 3600)
+        # Content is refreshed once less than this much of its lifetime remains
+        self.refresh_before = self.ttl / 4
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _off_peak_hours(value: str) -> Optional[set]:
+        try:
+            return parse_hours(value)
+        except ValueError:
+            logger.error("Invalid VIBE_PRECOMPUTE_OFFPEAK_HOURS %r; using %r", value, DEFAULT_OFF_PEAK_HOURS)
+            return parse_hours(DEFAULT_OFF_PEAK_HOURS)
+
+    def is_off_peak(self, now: Optional[float] = None) -> bool:
+        if self.off_peak_hours is None:
+            return True
+        return time.localtime(now).tm_hour in self.off_peak_hours
+
+    def _reserve_call(self) -> bool:
+        return self.store.reserve_spend(self.cost_per_call, self.daily_budget)
+
+    def refresh_inspiration(self, stats: Dict[str, Any]) -> bool:
+        """Regenerate stale inspiration for popular queries; False once the budget is spent"""
+        # Queries whose inspiration recently failed are backed off like event insights
+        skip = self.store.fresh_keys("inspire", self.refresh_before)
+        skip |= self.store.fresh_keys("inspire_failed", 0)
+        popular = self.store.popular("inspire", self.top_queries, time.time() - POPULARITY_WINDOW)
+        for query, _ in popular:
+            if query in skip:
+                continue
+            if not self._reserve_call():
+                return False
+            try:
+                result = self.orchestrator.generate_inspiration(query)
+            except Exception as e:
+                logger.warning("Precomputing inspiration failed: %s", e)
+                self.store.put("inspire_failed", query, {"failedAt": time.time()}, self.retry_after)
+                stats["failed"] += 1
+                continue
+            self.store.put("inspire", query, result, self.ttl)
+            stats["inspire"] += 1
+        return True
+
+    def refresh_event_insights(self, stats: Dict[str, Any]) -> bool:
+        """Generate insights for upcoming events lacking fresh ones; False once the budget is spent"""
+        # Events whose insights recently failed are backed off so each pass doesn't pay for them again
+        skip = self.store.fresh_keys("event_insight", self.refresh_before)
+        skip |= self.store.fresh_keys("event_insight_failed", 0)
+        pending = [
+            event for event in self.events.list_upcoming(limit=self.upcoming_events)
+            if event_insight_key(event) not in skip
+        ]
+        for start in range(0, len(pending), AI_ENRICH_TOP_N):
+            chunk = pending[start:start + AI_ENRICH_TOP_N]
+            if not self._reserve_call():
+                return False
+            try:
+                insights = self.orchestrator.generate_event_insights(chunk)
+            except Exception as e:
+                logger.warning("Precomputing event insights failed: %s", e)
+                insights = {}
+            for event in chunk:
+                key = event_insight_key(event)
+                if insights.get(event["id"]):
+                    self.store.put("event_insight", key, insights[event["id"]], self.ttl)
+                    stats["event_insight"] += 1
+                else:
+                    self.store.put("event_insight_failed", key, {"failedAt": time.time()}, self.retry_after)
+                    stats["failed"] += 1
+        return True
+
+    def run_once(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Run one precomputation pass
+
+        Args:
+            force: Run even outside off-peak hours
+
+        Returns:
+            Counts of generated items and whether the budget ran out
+        """
+        self.store.flush_requests()
+        stats = {"inspire": 0, "event_insight": 0, "failed": 0, "budget_exhausted": False, "skipped": False}
+        if not force and not self.is_off_peak():
+            stats["skipped"] = True
+            return stats
+
+        within_budget = self.refresh_inspiration(stats) and self.refresh_event_insights(stats)
+        stats["budget_exhausted"] = not within_budget
+        stats["spent_today_usd"] = round(self.store.spent_today(), 4)
+        logger.info("Precompute pass finished: %s", stats)
+        return stats
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Precompute pass failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the scheduler on a daemon thread (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="ai-precompute", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# Global scheduler instance
+precompute_scheduler = PrecomputeScheduler()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute AI content off-peak")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    parser.add_argument("--force", action="store_true", help="Ignore off-peak hours")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if args.once:
+        print(json.dumps(precompute_scheduler.run_once(force=args.force)))
+        return 0
+    if args.force:
+        precompute_scheduler.off_peak_hours = None
+    precompute_scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        precompute_scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
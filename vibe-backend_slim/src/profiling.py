@@ -0,0 +1,222 @@
+"""
+Request Profiling
+Opt-in CPU profiling and tracemalloc snapshots around request handlers
+Profiles are kept in a bounded ring buffer and served from the admin API
+
+Enable with VIBE_PROFILING=1. When disabled no hooks are registered, so
+requests pay nothing.
+"""
+
+import cProfile
+import hmac
+import logging
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque, defaultdict
+from typing import Dict, Any, List, Optional
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# Number of functions and allocation sites kept per profile
+TOP_N = 30
+
+# WSGI environ key holding the in-progress profile of a request
+ENVIRON_KEY = 'vibe.profile'
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class RequestProfiler:
+    """Profiles sampled or explicitly requested handler executions"""
+
+    def __init__(self):
+        """
+        Environment:
+            VIBE_PROFILING: "1" to register the hooks
+            VIBE_PROFILE_SAMPLE_RATE: Fraction of requests profiled (default 0)
+            VIBE_PROFILE_TOKEN: Requests with a matching X-Profile-Token header are always
+                profiled (defaults to VIBE_ADMIN_TOKEN)
+            VIBE_PROFILE_CAPACITY: Profiles kept in the ring buffer (default 50)
+            VIBE_PROFILE_TRACEMALLOC_FRAMES: Stack depth recorded per allocation (default 1)
+        """
+        self.enabled = os.getenv('VIBE_PROFILING') == '1'
+        self.sample_rate = _env_float('VIBE_PROFILE_SAMPLE_RATE', 0.0)
+        self.token = os.getenv('VIBE_PROFILE_TOKEN') or os.getenv('VIBE_ADMIN_TOKEN')
+        self.tracemalloc_frames = int(_env_float('VIBE_PROFILE_TRACEMALLOC_FRAMES', 1))
+        self._profiles = deque(maxlen=int(_env_float('VIBE_PROFILE_CAPACITY', 50)))
+        self._profiles_lock = threading.Lock()
+        # cProfile and tracemalloc are process-wide, so only one request is profiled at a time
+        self._active = threading.Lock()
+
+    def init_app(self, app):
+        """Register the profiling hooks if profiling is enabled"""
+        if not self.enabled:
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._abort)
+
+    def _trigger(self) -> Optional[str]:
+        if request.blueprint == 'admin':
+            return None
+        header = request.headers.get('X-Profile-Token')
+        if header and self.token and hmac.compare_digest(header, self.token):
+            return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def _start(self):
+        trigger = self._trigger()
+        if trigger is None or not self._active.acquire(blocking=False):
+            return
+        started_tracemalloc = False
+        try:
+            started_tracemalloc = not tracemalloc.is_tracing()
+            if started_tracemalloc:
+                tracemalloc.start(self.tracemalloc_frames)
+            # Kept on the request environ rather than g, which sub-requests may share
+            state = {
+                'trigger': trigger,
+                'started_tracemalloc': started_tracemalloc,
+                'snapshot': tracemalloc.take_snapshot(),
+                'profiler': cProfile.Profile(),
+                'started': time.perf_counter(),
+                'started_at': time.time(),
+            }
+            state['profiler'].enable()
+        except Exception as e:
+            # Never fail the request over the profiler; free it for the next one
+            if started_tracemalloc:
+                tracemalloc.stop()
+            self._active.release()
+            logger.warning("Failed to start request profiling: %s", e)
+            return
+        request.environ[ENVIRON_KEY] = state
+
+    def _stop(self) -> Optional[Dict[str, Any]]:
+        state = request.environ.pop(ENVIRON_KEY, None)
+        if state is None:
+            return None
+        try:
+            state['profiler'].disable()
+            state['duration'] = time.perf_counter() - state['started']
+            state['allocations'] = tracemalloc.take_snapshot().compare_to(state['snapshot'], 'lineno')
+            if state['started_tracemalloc']:
+                tracemalloc.stop()
+        finally:
+            self._active.release()
+        return state
+
+    def _finish(self, response):
+        state = self._stop()
+        if state is not None:
+            self._record(state, response.status_code)
+        return response
+
+    def _abort(self, exc):
+        # Unhandled errors skip after_request; still release the profiler
+        state = self._stop()
+        if state is not None:
+            self._record(state, 500)
+
+    def _record(self, state: Dict[str, Any], status: int):
+        stats = pstats.Stats(state['profiler'])
+
+        functions = []
+        for (filename, line, name), (calls, _, tottime, cumtime, _) in stats.stats.items():
+            functions.append({
+                'function': f"{filename}:{line}({name})",
+                'calls': calls,
+                'tottime': tottime,
+                'cumtime': cumtime,
+            })
+        functions.sort(key=lambda item: item['cumtime'], reverse=True)
+
+        allocations = [
+            {
+                'site': str(diff.traceback[0]) if diff.traceback else '?',
+                'sizeDiff': diff.size_diff,
+                'countDiff': diff.count_diff,
+            }
+            for diff in state['allocations'][:TOP_N]
+        ]
+
+        profile = {
+            'id': uuid.uuid4().hex,
+            'route': request.url_rule.rule if request.url_rule else request.path,
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'trigger': state['trigger'],
+            'startedAt': state['started_at'],
+            'durationMs': round(state['duration'] * 1000, 3),
+            'allocatedBytes': sum(diff.size_diff for diff in state['allocations'] if diff.size_diff > 0),
+            'topFunctions': functions[:TOP_N],
+            'topAllocations': allocations,
+            # pstats-compatible dump, as written by cProfile.Profile.dump_stats
+            'raw': marshal.dumps(stats.stats),
+        }
+        with self._profiles_lock:
+            self._profiles.append(profile)
+
+    @staticmethod
+    def _summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in profile.items() if key not in ('raw', 'topFunctions', 'topAllocations')}
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first"""
+        with self._profiles_lock:
+            profiles = list(self._profiles)
+        return [self._summary(profile) for profile in reversed(profiles)]
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """A stored profile including its raw pstats dump, or None"""
+        with self._profiles_lock:
+            return next((profile for profile in self._profiles if profile['id'] == profile_id), None)
+
+    def aggregate(self) -> Dict[str, Any]:
+        """Per-route totals of the top functions (by cumulative time) and allocation sites"""
+        with self._profiles_lock:
+            profiles = list(self._profiles)
+
+        routes = defaultdict(lambda: {
+            'profiles': 0, 'totalMs': 0.0, 'functions': defaultdict(float), 'allocations': defaultdict(int)
+        })
+        for profile in profiles:
+            route = routes[f"{profile['method']} {profile['route']}"]
+            route['profiles'] += 1
+            route['totalMs'] += profile['durationMs']
+            for function in profile['topFunctions']:
+                route['functions'][function['function']] += function['cumtime']
+            for allocation in profile['topAllocations']:
+                route['allocations'][allocation['site']] += allocation['sizeDiff']
+
+        result = {}
+        for name, route in routes.items():
+            functions = sorted(route['functions'].items(), key=lambda item: item[1], reverse=True)[:TOP_N]
+            allocations = sorted(route['allocations'].items(), key=lambda item: item[1], reverse=True)[:TOP_N]
+            result[name] = {
+                'profiles': route['profiles'],
+                'avgDurationMs': round(route['totalMs'] / route['profiles'], 3),
+                'topFunctions': [{'function': function, 'cumtime': total} for function, total in functions],
+                'topAllocations': [{'site': site, 'sizeDiff': total} for site, total in allocations],
+            }
+        return result
+
+
+# Global request profiler instance
+request_profiler = RequestProfiler()
@@ -0,0 +1,351 @@
+"""
+Event Ranking
+Encodes events and user preferences as NumPy feature matrices and scores
+candidates with a single matrix-vector product
+Catalog feature matrices are cached per catalog version and rebuilt in the
+background when the catalog changes
+"""
+
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.event_store import EventStore, event_store
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on catalog events encoded in one feature matrix
+MAX_CANDIDATES = 50000
+
+# Feature matrices kept for category-filtered candidate sets (used once the catalog exceeds MAX_CANDIDATES)
+MAX_CACHED_MATRICES = 16
+
+TEXT_DIMENSIONS = 64
+
+TIME_SLOTS = ("morning", "afternoon", "evening")
+
+# Price bands as (lower bound, upper bound) in dollars: free, budget, mid, premium
+PRICE_BANDS = ((0.0, 0.0), (0.01, 15.0), (15.01, 30.0), (30.01, float("inf")))
+
+# Relative weight of each preference in the score
+WEIGHTS = {
+    "category": 2.0,
+    "time_slot": 1.0,
+    "weekend": 0.5,
+    "price_within": 0.5,
+    "price_over": -1.0,
+    "proximity": 1.0,
+    "text": 1.5,
+}
+
+_HOUR = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([AaPp][Mm])?")
+_DISTANCE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:mi|miles?)\b", re.IGNORECASE)
+_PRICE = re.compile(r"\d+(?:\.\d+)?")
+_TOKEN = re.compile(r"[a-z0-9]{3,}")
+_WEEKEND = ("saturday", "sunday", "weekend", "daily")
+
+
+def _time_slot(hour: Optional[str]) -> int:
+    """Index into TIME_SLOTS, or -1 if the hour cannot be parsed"""
+    match = _HOUR.search(hour or "")
+    if not match:
+        return -1
+    value = int(match.group(1)) % 12 if match.group(3) else int(match.group(1))
+    if match.group(3) and match.group(3).lower() == "pm":
+        value += 12
+    if value < 12:
+        return 0
+    return 1 if value < 17 else 2
+
+
+def _price(price: Optional[str]) -> float:
+    """Dollar amount of a price label; NaN if unknown"""
+    if not price:
+        return float("nan")
+    if price.strip().lower() == "free":
+        return 0.0
+    match = _PRICE.search(price)
+    return float(match.group()) if match else float("nan")
+
+
+def _distance(location: Optional[str]) -> float:
+    """Distance in miles parsed from a location label; NaN if absent"""
+    match = _DISTANCE.search(location or "")
+    return float(match.group(1)) if match else float("nan")
+
+
+def _tokens(text: str) -> List[int]:
+    """Hashed token columns; crc32 keeps them stable across processes"""
+    return [zlib.crc32(token.encode("utf-8")) % TEXT_DIMENSIONS for token in _TOKEN.findall(text.lower())]
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(item).strip().lower() for item in value if str(item).strip()]
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_preferences(source: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalize user preferences from request args or a JSON object
+
+    Recognized keys: interests (or categories), timeOfDay, weekend, maxPrice,
+    maxDistance, keywords. List values may be arrays or comma-separated strings.
+
+    Returns:
+        Normalized preferences, or None if none were given
+    """
+    if not source:
+        return None
+    weekend = source.get("weekend")
+    prefs = {
+        "categories": _as_list(source.get("interests") or source.get("categories")),
+        "time_slots": [slot for slot in _as_list(source.get("timeOfDay")) if slot in TIME_SLOTS],
+        "weekend": str(weekend).lower() in ("1", "true", "yes") if weekend is not None else False,
+        "max_price": _as_float(source.get("maxPrice")),
+        "max_distance": _as_float(source.get("maxDistance")),
+        "keywords": _as_list(source.get("keywords")),
+    }
+    # Limits of zero are meaningful (e.g. free events only), so only None counts as unset
+    limits = (prefs["max_price"], prefs["max_distance"])
+    if not any((prefs["categories"], prefs["time_slots"], prefs["weekend"], prefs["keywords"])) \
+            and all(limit is None for limit in limits):
+        return None
+    return prefs
+
+
+class EventFeatures:
+    """Feature matrix for a list of events; rows align with keys"""
+
+    def __init__(self, events: List[Dict[str, Any]], keys: List[Tuple[str, str]], truncated: bool = False):
+        n = len(events)
+        self.keys = keys
+        # True if candidates were cut off at MAX_CANDIDATES
+        self.truncated = truncated
+        self.categories = sorted({(event.get("category") or "").lower() for event in events})
+        category_index = {category: i for i, category in enumerate(self.categories)}
+
+        self.category_codes = np.fromiter(
+            (category_index[(event.get("category") or "").lower()] for event in events), dtype=np.int32, count=n
+        )
+        self.prices = np.fromiter((_price(event.get("price")) for event in events), dtype=np.float64, count=n)
+        self.distances = np.fromiter((_distance(event.get("location")) for event in events), dtype=np.float64, count=n)
+        slots = np.fromiter((_time_slot(event.get("hour")) for event in events), dtype=np.int32, count=n)
+        weekend = np.fromiter(
+            (any(word in (event.get("time") or "").lower() for word in _WEEKEND) for event in events),
+            dtype=np.float64, count=n
+        )
+
+        # Column blocks: category one-hot | time slot one-hot | weekend | price band one-hot | proximity | text
+        self.blocks = {}
+        offset = 0
+        for name, width in (("category", len(self.categories)), ("time_slot", len(TIME_SLOTS)), ("weekend", 1),
+                            ("price_band", len(PRICE_BANDS)), ("proximity", 1), ("text", TEXT_DIMENSIONS)):
+            self.blocks[name] = slice(offset, offset + width)
+            offset += width
+
+        matrix = np.zeros((n, offset), dtype=np.float32)
+        rows = np.arange(n)
+        matrix[rows, self.blocks["category"].start + self.category_codes] = 1.0
+        has_slot = slots >= 0
+        matrix[rows[has_slot], self.blocks["time_slot"].start + slots[has_slot]] = 1.0
+        matrix[:, self.blocks["weekend"].start] = weekend
+        for band, (low, high) in enumerate(PRICE_BANDS):
+            matrix[:, self.blocks["price_band"].start + band] = (self.prices >= low) & (self.prices <= high)
+        known = ~np.isnan(self.distances)
+        matrix[known, self.blocks["proximity"].start] = 1.0 / (1.0 + self.distances[known])
+
+        text = np.zeros((n, TEXT_DIMENSIONS), dtype=np.float32)
+        token_rows, token_cols = [], []
+        for i, event in enumerate(events):
+            columns = _tokens(f"{event.get('title') or ''} {event.get('description') or ''}")
+            token_rows.extend([i] * len(columns))
+            token_cols.extend(columns)
+        np.add.at(text, (np.asarray(token_rows, dtype=np.intp), np.asarray(token_cols, dtype=np.intp)), 1.0)
+        norms = np.linalg.norm(text, axis=1, keepdims=True)
+        matrix[:, self.blocks["text"]] = np.divide(text, norms, out=np.zeros_like(text), where=norms > 0)
+        self.matrix = matrix
+
+    def preference_vector(self, prefs: Dict[str, Any]) -> np.ndarray:
+        """Weight vector such that matrix @ vector scores each event against prefs"""
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        for category in prefs.get("categories", []):
+            if category in self.categories:
+                vector[self.blocks["category"].start + self.categories.index(category)] = WEIGHTS["category"]
+        for slot in prefs.get("time_slots", []):
+            vector[self.blocks["time_slot"].start + TIME_SLOTS.index(slot)] = WEIGHTS["time_slot"]
+        if prefs.get("weekend"):
+            vector[self.blocks["weekend"].start] = WEIGHTS["weekend"]
+        max_price = prefs.get("max_price")
+        if max_price is not None:
+            for band, (low, _) in enumerate(PRICE_BANDS):
+                within = low <= max_price
+                vector[self.blocks["price_band"].start + band] = WEIGHTS["price_within" if within else "price_over"]
+        vector[self.blocks["proximity"].start] = WEIGHTS["proximity"]
+        if prefs.get("keywords"):
+            keywords = np.zeros(TEXT_DIMENSIONS, dtype=np.float32)
+            np.add.at(keywords, _tokens(" ".join(prefs["keywords"])), 1.0)
+            norm = np.linalg.norm(keywords)
+            if norm > 0:
+                vector[self.blocks["text"]] = WEIGHTS["text"] * keywords / norm
+        return vector
+
+    def score(self, prefs: Dict[str, Any]) -> np.ndarray:
+        """Score every row against prefs"""
+        scores = self.matrix @ self.preference_vector(prefs)
+        max_distance = prefs.get("max_distance")
+        if max_distance is not None:
+            # Events beyond the requested distance sink below all in-range events
+            scores = scores - np.where(self.distances > max_distance, 100.0, 0.0)
+        return scores
+
+    def top_k(self, prefs: Dict[str, Any], k: int, category: Optional[str] = None) -> np.ndarray:
+        """
+        Row indices of the k best-scoring events, best first
+
+        Args:
+            prefs: Normalized preferences (see parse_preferences)
+            k: Number of results
+            category: Optional hard category filter
+        """
+        scores = self.score(prefs)
+        candidates = np.arange(len(scores))
+        if category:
+            code = self.categories.index(category.lower()) if category.lower() in self.categories else -1
+            candidates = candidates[self.category_codes == code]
+        if k <= 0 or not len(candidates):
+            return candidates[:0]
+        candidate_scores = scores[candidates]
+        if k < len(candidates):
+            best = np.argpartition(-candidate_scores, k - 1)[:k]
+        else:
+            best = np.arange(len(candidates))
+        # Stable sort keeps catalog order among equal scores
+        order = best[np.argsort(-candidate_scores[best], kind="stable")]
+        return candidates[order]
+
+
+class EventRanker:
+    """
+    Ranks catalog events for a user, reusing feature matrices per catalog version
+
+    Once built, a matrix keeps being served while a newer one is built on a
+    background thread, so catalog imports never rebuild on the request path.
+    """
+
+    def __init__(self, store: EventStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # Candidate filter (None for the whole catalog) -> (catalog version, features)
+        self._cached: "OrderedDict[Optional[Tuple[str, ...]], Tuple[int, EventFeatures]]" = OrderedDict()
+        self._rebuilding = set()
+
+    def _build(self, categories: Optional[Tuple[str, ...]]) -> EventFeatures:
+        """Encode catalog events, optionally pre-filtered to categories in SQL"""
+        keys = self.store.list_event_keys(categories=list(categories) if categories else None,
+                                          limit=MAX_CANDIDATES + 1)
+        truncated = len(keys) > MAX_CANDIDATES
+        if truncated:
+            logger.warning("Ranking candidates capped at %d events (categories: %s)",
+                           MAX_CANDIDATES, ", ".join(categories) if categories else "all")
+            keys = keys[:MAX_CANDIDATES]
+        found = self.store.get_events_by_ids([event_id for event_id, _ in keys])
+        keys = [(event_id, found[event_id][1]) for event_id, _ in keys if event_id in found]
+        return EventFeatures([found[event_id][0] for event_id, _ in keys], keys, truncated)
+
+    def _store(self, categories: Optional[Tuple[str, ...]], version: int, features: EventFeatures):
+        with self._lock:
+            self._cached[categories] = (version, features)
+            self._cached.move_to_end(categories)
+            while len(self._cached) > MAX_CACHED_MATRICES:
+                self._cached.popitem(last=False)
+
+    def _rebuild(self, categories: Optional[Tuple[str, ...]]):
+        try:
+            version = self.store.version()
+            self._store(categories, version, self._build(categories))
+        except Exception as e:
+            logger.error("Rebuilding ranking features failed: %s", e)
+        finally:
+            with self._lock:
+                self._rebuilding.discard(categories)
+
+    def features(self, categories: Optional[Tuple[str, ...]] = None) -> Tuple[int, EventFeatures]:
+        """
+        Feature matrix for the catalog, or for the events in the given categories
+
+        Returns the cached matrix even if the catalog has changed since it was
+        built, scheduling a background rebuild; builds synchronously only on a miss.
+
+        Returns:
+            (catalog version the matrix was built at, features)
+        """
+        version = self.store.version()
+        with self._lock:
+            cached = self._cached.get(categories)
+            if cached is not None:
+                self._cached.move_to_end(categories)
+                stale = cached[0] != version and categories not in self._rebuilding
+                if stale:
+                    self._rebuilding.add(categories)
+        if cached is None:
+            with self._build_lock:
+                with self._lock:
+                    cached = self._cached.get(categories)
+                if cached is None:
+                    features = self._build(categories)
+                    self._store(categories, version, features)
+                    return version, features
+            return cached
+        if stale:
+            threading.Thread(target=self._rebuild, args=(categories,), name="ranking-rebuild", daemon=True).start()
+        return cached
+
+    def catalog_features(self) -> Tuple[int, EventFeatures]:
+        """Feature matrix for the whole catalog (possibly one version behind) and its version"""
+        return self.features()
+
+    def rank_catalog(self, prefs: Dict[str, Any], k: int,
+                     category: Optional[str] = None) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Top-k catalog events for a user
+
+        If the catalog is too large to encode whole, candidates are pre-filtered
+        in SQL to the requested category or the user's preferred categories.
+
+        Returns:
+            The catalog version the ranking reflects, and (event ID, content hash)
+            pairs, best first
+        """
+        version, features = self.catalog_features()
+        if features.truncated:
+            categories = [category] if category else prefs.get("categories")
+            if categories:
+                version, features = self.features(tuple(sorted({value.lower() for value in categories})))
+        return version, [features.keys[i] for i in features.top_k(prefs, k, category)]
+
+    def rank_events(self, events: List[Dict[str, Any]], prefs: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Order an arbitrary list of events for a user (no caching)"""
+        if not events or not prefs:
+            return list(events)
+        features = EventFeatures(events, [(event.get("id"), "") for event in events])
+        return [events[i] for i in features.top_k(prefs, len(events))]
+
+
+# Global ranker instance
+event_ranker = EventRanker(event_store)
@@ -0,0 +1,111 @@
+from flask import Blueprint, Response, request, jsonify
+from functools import wraps
+import hmac
+import logging
+import os
+import tempfile
+from src.event_store import event_store
+from src.ingest import FORMATS, DEFAULT_BATCH_SIZE, check_batch_size, detect_format, start_import_job, get_import_job
+from src.logging_config import logging_stats
+from src.profiling import request_profiler
+
+admin_bp = Blueprint('admin', __name__)
+
+logger = logging.getLogger(__name__)
+
+def require_admin(view):
+    """Allow the request only if it carries the configured X-Admin-Token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = os.getenv('VIBE_ADMIN_TOKEN')
+        if not token:
+            return jsonify({'error': 'Admin API is disabled'}), 403
+        if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/events/import', methods=['POST'])
+@require_admin
+def import_events():
+    """Upload a CSV, JSONL or iCalendar feed and import it in the background"""
+    try:
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({'error': 'Missing file upload'}), 400
+
+        fmt = request.form.get('format')
+        if fmt and fmt not in FORMATS:
+            return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+        try:
+            fmt = fmt or detect_format(upload.filename)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            batch_size = check_batch_size(int(request.form.get('batchSize', DEFAULT_BATCH_SIZE)))
+        except ValueError:
+            return jsonify({'error': 'batchSize must be a positive integer'}), 400
+
+        # Stream the upload to disk; the importer re-reads it in constant memory
+        fd, path = tempfile.mkstemp(suffix=f'.{fmt}')
+        with os.fdopen(fd, 'wb') as fp:
+            upload.save(fp)
+
+        job = start_import_job(path, fmt, batch_size=batch_size, delete_after=True)
+        logger.info("Started event import job %s (%s)", job['id'], fmt)
+        return jsonify({'jobId': job['id'], 'status': job['status']}), 202
+
+    except Exception as e:
+        logger.error("Error starting event import: %s", e)
+        return jsonify({'error': 'Failed to start event import'}), 500
+
+@admin_bp.route('/events/import/<job_id>', methods=['GET'])
+@require_admin
+def import_status(job_id):
+    """Get the progress of a background event import"""
+    job = get_import_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    # The import thread keeps updating the job, so serialize a snapshot of it
+    return jsonify(dict(job, stats=dict(job['stats']),
+                        catalogVersion=event_store.version(), catalogSize=event_store.count()))
+
+@admin_bp.route('/logging', methods=['GET'])
+@require_admin
+def get_logging_stats():
+    """Get logging pipeline counters and per-record overhead"""
+    return jsonify(logging_stats())
+
+@admin_bp.route('/profiles', methods=['GET'])
+@require_admin
+def list_profiles():
+    """List stored request profiles, newest first"""
+    return jsonify({'enabled': request_profiler.enabled, 'profiles': request_profiler.list_profiles()})
+
+@admin_bp.route('/profiles/aggregate', methods=['GET'])
+@require_admin
+def aggregate_profiles():
+    """Top functions and allocation sites per route across stored profiles"""
+    return jsonify(request_profiler.aggregate())
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@require_admin
+def get_profile(profile_id):
+    """Get one request profile with its top functions and allocation sites"""
+    profile = request_profiler.get_profile(profile_id)
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify({key: value for key, value in profile.items() if key != 'raw'})
+
+@admin_bp.route('/profiles/<profile_id>/download', methods=['GET'])
+@require_admin
+def download_profile(profile_id):
+    """Download a request profile as a pstats file (e.g. for snakeviz or pstats.Stats)"""
+    profile = request_profiler.get_profile(profile_id)
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(
+        profile['raw'],
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.prof'}
+    )
@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 import logging
 from src.ai_orchestrator import ai_orchestrator
+from src.event_store import event_store
+from src.logging_config import log_event
 
 ai_bp = Blueprint('ai', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_ANALYZE_EVENTS = 50
+
 @ai_bp.route('/generate-idea', methods=['POST'])
 def generate_idea():
     """Generate a new idea using AI with optional research"""
@@ -21,11 +23,11 @@ def generate_idea():
         # Use AI orchestrator for enhanced idea generation
         result = ai_orchestrator.generate_idea_with_research(prompt)
         
-        logger.info(f"Generated idea for prompt: {prompt}")
+        log_event(logger, logging.INFO, "generate_idea", prompt_chars=len(str(prompt)))
         return jsonify(result)
         
     except Exception as e:
-        logger.error(f"Error generating idea: {str(e)}")
+        logger.error("Error generating idea: %s", e)
         return jsonify({'error': 'Failed to generate idea'}), 500
 
 @ai_bp.route('/inspire', methods=['POST'])
@@ -41,13 +43,41 @@ def inspire():
         # Use AI orchestrator for enhanced inspiration
         result = ai_orchestrator.inspire_with_search(query)
         
-        logger.info(f"Generated inspiration for query: {query}")
+        log_event(logger, logging.INFO, "inspire", query_chars=len(str(query)))
         return jsonify(result)
         
     except Exception as e:
-        logger.error(f"Error generating inspiration: {str(e)}")
+        logger.error("Error generating inspiration: %s", e)
         return jsonify({'error': 'Failed to generate inspiration'}), 500
 
+@ai_bp.route('/analyze-events', methods=['POST'])
+def analyze_events():
+    """Rank catalog events for the user and add AI insights to the top few"""
+    try:
+        data = request.get_json(silent=True)
+        event_ids = data.get('eventIds') if isinstance(data, dict) else None
+        if not isinstance(event_ids, list) or not event_ids:
+            return jsonify({'error': 'Missing eventIds list in request body'}), 400
+        if len(event_ids) > MAX_ANALYZE_EVENTS:
+            return jsonify({'error': f'Too many events (max {MAX_ANALYZE_EVENTS})'}), 400
+        preferences = data.get('preferences')
+        if preferences is not None and not isinstance(preferences, dict):
+            return jsonify({'error': 'preferences must be an object'}), 400
+        
+        # Catalog rows match what the precompute job enriched, so stored insights are served
+        event_ids = list(dict.fromkeys(str(event_id) for event_id in event_ids))
+        found = event_store.get_events_by_ids(event_ids)
+        events = [found[event_id][0] for event_id in event_ids if event_id in found]
+        
+        result = ai_orchestrator.analyze_events_with_ai(events, preferences)
+        
+        log_event(logger, logging.INFO, "analyze_events", requested=len(event_ids), found=len(events))
+        return jsonify({'events': result})
+        
+    except Exception as e:
+        logger.error("Error analyzing events: %s", e)
+        return jsonify({'error': 'Failed to analyze events'}), 500
+
 @ai_bp.route('/tools', methods=['GET'])
 def get_tools():
     """Get available MCP tools"""
@@ -56,6 +86,16 @@ def get_tools():
         return jsonify({'tools': tools})
         
     except Exception as e:
-        logger.error(f"Error retrieving tools: {str(e)}")
+        logger.error("Error retrieving tools: %s", e)
         return jsonify({'error': 'Failed to retrieve tools'}), 500
 
+
+@ai_bp.route('/stats', methods=['GET'])
+def get_stats():
+    """Get AI request coalescing counters"""
+    try:
+        return jsonify(ai_orchestrator.get_stats())
+        
+    except Exception as e:
+        logger.error("Error retrieving AI stats: %s", e)
+        return jsonify({'error': 'Failed to retrieve AI stats'}), 500
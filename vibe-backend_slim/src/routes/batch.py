@@ -0,0 +1,97 @@
+from flask import Blueprint, request, jsonify, current_app
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import time
+
+batch_bp = Blueprint('batch', __name__)
+
+logger = logging.getLogger(__name__)
+
+ACTIONS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'actions.json')
+
+MAX_BATCH_ACTIONS = 20
+MAX_CONCURRENCY = 8
+
+# Headers from the batch request that are forwarded to every dispatched action
+# (admin credentials are deliberately not forwarded)
+FORWARDED_HEADERS = ('Authorization', 'Cookie', 'Accept-Language')
+
+def load_actions(path=ACTIONS_PATH):
+    """Load the action registry, excluding the batch endpoint itself"""
+    with open(path) as f:
+        actions = json.load(f)
+    return {name: spec for name, spec in actions.items() if spec.get('path') != '/api/batch'}
+
+ACTIONS = load_actions()
+
+def dispatch_action(app, item, headers):
+    """Run one named action through the app in-process and capture its response"""
+    name = item['action']
+    spec = ACTIONS[name]
+    method = spec['method'].upper()
+    args = item.get('args') or {}
+
+    result = {'action': name}
+    if 'id' in item:
+        result['id'] = item['id']
+
+    options = {'method': method, 'headers': headers}
+    if method == 'GET':
+        options['query_string'] = args
+    else:
+        options['json'] = args
+
+    started = time.perf_counter()
+    try:
+        # A fresh app context gives the action its own g, separate from the batch request's
+        with app.app_context(), app.test_request_context(spec['path'], **options):
+            response = app.full_dispatch_request()
+        result['status'] = response.status_code
+        result['body'] = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+    except Exception as e:
+        logger.error("Batched action %s failed: %s", name, e)
+        result['status'] = 500
+        result['body'] = {'error': f'Action {name} failed'}
+    result['ok'] = result['status'] < 400
+    result['durationMs'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+@batch_bp.route('/batch', methods=['POST'])
+def batch():
+    """Run several independent actions from config/actions.json in one round trip"""
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('actions') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Missing actions list in request body'}), 400
+        if len(items) > MAX_BATCH_ACTIONS:
+            return jsonify({'error': f'Too many actions (max {MAX_BATCH_ACTIONS})'}), 400
+
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or item.get('action') not in ACTIONS:
+                return jsonify({'error': f'Unknown action at index {index}'}), 400
+            if not isinstance(item.get('args', {}), dict):
+                return jsonify({'error': f'args must be an object at index {index}'}), 400
+
+        app = current_app._get_current_object()
+        headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+
+        started = time.perf_counter()
+        if len(items) == 1:
+            results = [dispatch_action(app, items[0], headers)]
+        else:
+            # Actions are independent, so they run concurrently; results keep request order
+            with ThreadPoolExecutor(max_workers=min(len(items), MAX_CONCURRENCY)) as pool:
+                results = list(pool.map(lambda item: dispatch_action(app, item, headers), items))
+
+        logger.info("Dispatched batch of %d actions", len(items))
+        return jsonify({
+            'results': results,
+            'durationMs': round((time.perf_counter() - started) * 1000, 2)
+        })
+
+    except Exception as e:
+        logger.error("Error processing batch: %s", e)
+        return jsonify({'error': 'Failed to process batch'}), 500
@@ -4,11 +4,10 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+from src.logging_config import log_event, redact_email
 
 ops_bp = Blueprint('ops', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @ops_bp.route('/contact', methods=['POST'])
@@ -30,7 +29,8 @@ def contact():
         
         # In a real application, you would send an actual email
         # For this demo, we'll just log the contact attempt
-        logger.info(f"Contact form submission - Name: {name}, Email: {email}, Subject: {subject}")
+        log_event(logger, logging.INFO, "contact_submitted", email=redact_email(email),
+                  subject_chars=len(subject), message_chars=len(message))
         
         # Simulate email sending (replace with actual email service in production)
         try:
@@ -44,14 +44,14 @@ def contact():
             })
             
         except Exception as email_error:
-            logger.error(f"Failed to send email: {str(email_error)}")
+            logger.error("Failed to send email: %s", email_error)
             return jsonify({
                 'status': 'failure',
                 'message': 'Failed to send message. Please try again later.'
             }), 500
         
     except Exception as e:
-        logger.error(f"Error processing contact form: {str(e)}")
+        logger.error("Error processing contact form: %s", e)
         return jsonify({'error': 'Failed to process contact form'}), 500
 
 @ops_bp.route('/update-location', methods=['POST'])
@@ -78,7 +78,7 @@ def update_location():
                 'message': 'Location cannot be empty'
             }), 400
         
-        logger.info(f"Location updated to: {location}, Zip: {zip_code}")
+        log_event(logger, logging.INFO, "location_updated", has_zip=bool(zip_code))
         
         return jsonify({
             'status': 'success',
@@ -87,7 +87,7 @@ def update_location():
         })
         
     except Exception as e:
-        logger.error(f"Error updating location: {str(e)}")
+        logger.error("Error updating location: %s", e)
         return jsonify({'error': 'Failed to update location'}), 500
 
 def mock_send_email(name, email, subject, message):
@@ -129,6 +129,6 @@ def mock_send_email(name, email, subject, message):
     # server.quit()
     
     # For demo purposes, just log the email
-    logger.info(f"Mock email sent - From: {email}, Subject: {subject}")
+    log_event(logger, logging.INFO, "mock_email_sent", email=redact_email(email))
     return True
 
@@ -1,14 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+import hashlib
 import logging
 import random
+from src.event_store import event_store
+from src.event_payloads import PAYLOAD_FORMAT_VERSION, event_payloads
+from src.ranking import event_ranker, parse_preferences
 
 realtime_bp = Blueprint('realtime', __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Mock event data for demonstration
+# Seed event data for an empty catalog; real feeds are loaded with src.ingest
 MOCK_EVENTS = [
     {
         "id": "1",
@@ -100,6 +102,30 @@ MOCK_EVENTS = [
     }
 ]
 
+event_store.seed(MOCK_EVENTS)
+
+# Number of events returned by a listing
+PAGE_SIZE = 6
+
+# Clients and CDNs may cache responses but must revalidate them with the ETag
+CACHE_CONTROL = 'public, no-cache'
+
+def json_response(body, etag):
+    """Wrap pre-serialized JSON bytes in a response carrying a strong ETag"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def not_modified(etag):
+    """Return a 304 response if the request already holds this ETag"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
+    return None
+
 @realtime_bp.route('/events', methods=['GET'])
 def get_events():
     """Get nearby events based on location and filters"""
@@ -110,50 +136,75 @@ def get_events():
         category = request.args.get('category', None)
         
         # Filter events by category if specified
-        events = MOCK_EVENTS.copy()
-        if category and category.lower() != 'all events':
-            events = [event for event in events if event['category'].lower() == category.lower()]
+        if category and category.lower() == 'all events':
+            category = None
         
-        # Simulate distance-based filtering (in a real app, this would use actual geolocation)
-        # For now, we'll just return a subset based on radius
-        max_events = min(len(events), radius // 2 + 3)  # Simulate fewer events for smaller radius
-        events = events[:max_events]
+        # Optional personalization (interests, timeOfDay, weekend, maxPrice, maxDistance, keywords)
+        preferences = parse_preferences(request.args)
         
-        # Add some randomization to make it feel more dynamic
-        if len(events) > 3:
-            events = random.sample(events, min(len(events), 6))
+        # The listing is fully determined by the payload format, catalog version
+        # and the query, so together they are a strong ETag
+        query_key = f"{zip_code}|{radius}|{(category or '').lower()}|{sorted((preferences or {}).items())}"
+        query_hash = hashlib.sha1(query_key.encode('utf-8')).hexdigest()[:16]
         
-        logger.info(f"Retrieved {len(events)} events for zip: {zip_code}, radius: {radius}, category: {category}")
-        return jsonify(events)
+        keys = None
+        if preferences:
+            # Rank the whole catalog for this user; the radius bounds distance unless given
+            if preferences['max_distance'] is None:
+                preferences['max_distance'] = float(radius)
+            # The ranking may come from a matrix one catalog version behind, so the
+            # ETag carries the version it was actually built at
+            version, keys = event_ranker.rank_catalog(preferences, PAGE_SIZE, category=category)
+        else:
+            version = event_store.version()
+        
+        etag = f"v{PAYLOAD_FORMAT_VERSION}-{version}-{query_hash}"
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        if keys is None:
+            # Simulate distance-based filtering (in a real app, this would use actual geolocation)
+            # For now, we'll just return a subset based on radius
+            max_events = max(radius // 2 + 3, 0)  # Simulate fewer events for smaller radius
+            keys = event_store.list_event_keys(category=category, limit=max_events)
+            
+            # Add some randomization to make it feel more dynamic; seeded by the ETag so
+            # the order only changes with the catalog
+            if len(keys) > 3:
+                keys = random.Random(etag).sample(keys, min(len(keys), PAGE_SIZE))
+        
+        logger.info("Retrieved %d events for zip: %s, radius: %s, category: %s", len(keys), zip_code, radius, category)
+        return json_response(event_payloads.list_body(keys), etag)
         
     except Exception as e:
-        logger.error(f"Error retrieving events: {str(e)}")
+        logger.error("Error retrieving events: %s", e)
         return jsonify({'error': 'Failed to retrieve events'}), 500
 
 @realtime_bp.route('/events/<event_id>', methods=['GET'])
 def get_event_details(event_id):
     """Get detailed information about a specific event"""
     try:
-        # Find the event by ID
-        event = next((e for e in MOCK_EVENTS if e['id'] == event_id), None)
+        # Find the event by ID; its content hash identifies this version of the details
+        content_hash = event_store.get_event_key(event_id)
         
-        if not event:
+        if not content_hash:
             return jsonify({'error': 'Event not found'}), 404
         
-        # Add additional details for the specific event view
-        detailed_event = event.copy()
-        detailed_event.update({
-            "fullDescription": f"{event['description']} This event is perfect for families and individuals looking to engage with their community. Registration is recommended but not required.",
-            "organizer": "Community Events Team",
-            "contact": "events@community.org",
-            "capacity": "50 people",
-            "requirements": "None - all skill levels welcome"
-        })
+        etag = f"v{PAYLOAD_FORMAT_VERSION}-{content_hash}"
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Detail view (fullDescription, organizer, ...) is pre-serialized per event version
+        body = event_payloads.detail_body(event_id, content_hash)
+        if body is None:
+            return jsonify({'error': 'Event not found'}), 404
         
-        logger.info(f"Retrieved details for event: {event_id}")
-        return jsonify(detailed_event)
+        logger.info("Retrieved details for event: %s", event_id)
+        return json_response(body, etag)
         
     except Exception as e:
-        logger.error(f"Error retrieving event details: {str(e)}")
+        logger.error("Error retrieving event details: %s", e)
         return jsonify({'error': 'Failed to retrieve event details'}), 500
 
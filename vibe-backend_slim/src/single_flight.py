@@ -0,0 +1,259 @@
+"""
+Single-flight request coalescing
+Concurrent calls that share a key wait on one in-flight computation
+and all receive the same result (or the same error)
+Optionally coordinates across worker processes through a SQLite lease table
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightError(Exception):
+    """Raised to waiters in other workers when the leading worker's call failed"""
+
+
+class _Call:
+    """A computation in flight in this process"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _SQLiteLease:
+    """
+    Cross-worker lease backed by a SQLite table
+
+    The first worker to claim a key computes the value and publishes it to the
+    table; other workers poll the row until the result appears or the lease expires.
+    """
+
+    def __init__(self, db_path: str, lease_ttl: float, result_ttl: float):
+        self.db_path = db_path
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        self._connect().execute(
+            """
+            CREATE TABLE IF NOT EXISTS single_flight_leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                done_at REAL,
+                result TEXT,
+                error TEXT
+            )
+            """
+        )
+
+    def acquire(self, key: str) -> Tuple[str, Optional[sqlite3.Row]]:
+        """
+        Try to become the leader for a key
+
+        Returns:
+            ("leader", None) if this worker must compute the value,
+            ("done", row) if another worker recently published a result,
+            ("wait", None) if another worker holds a live lease
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires_at, done_at, result, error FROM single_flight_leases WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                _, expires_at, done_at, _, _ = row
+                if done_at is not None and now - done_at <= self.result_ttl:
+                    return "done", row
+                if done_at is None and expires_at > now:
+                    return "wait", None
+            conn.execute(
+                "INSERT OR REPLACE INTO single_flight_leases (key, owner, expires_at, done_at, result, error) "
+                "VALUES (?, ?, ?, NULL, NULL, NULL)",
+                (key, self.owner, now + self.lease_ttl)
+            )
+            return "leader", None
+        finally:
+            conn.execute("COMMIT")
+
+    def complete(self, key: str, result: Optional[str] = None, error: Optional[str] = None):
+        """Publish the outcome of a leader's computation"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE single_flight_leases SET done_at = ?, result = ?, error = ? WHERE key = ? AND owner = ?",
+            (time.time(), result, error, key, self.owner)
+        )
+        conn.execute(
+            "DELETE FROM single_flight_leases WHERE done_at IS NOT NULL AND done_at < ?",
+            (time.time() - self.result_ttl,)
+        )
+
+    def release(self, key: str):
+        """Drop a lease without publishing (e.g. the result is not JSON-serializable)"""
+        self._connect().execute(
+            "DELETE FROM single_flight_leases WHERE key = ? AND owner = ?",
+            (key, self.owner)
+        )
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one execution"""
+
+    def __init__(self, lease_db_path: Optional[str] = None, lease_ttl: float = 60.0,
+                 result_ttl: float = 2.0, poll_interval: float = 0.05):
+        """
+        Args:
+            lease_db_path: Optional SQLite path used to coalesce across worker processes
+            lease_ttl: Seconds before another worker may take over an unfinished lease
+            result_ttl: Seconds a published cross-worker result stays visible to late waiters
+            poll_interval: Seconds between lease polls while another worker computes
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._lease = _SQLiteLease(lease_db_path, lease_ttl, result_ttl) if lease_db_path else None
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self._stats = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+            "coalesced_remote": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable key from JSON-serializable parts"""
+        raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless an identical call is already in flight
+
+        Args:
+            key: Identity of the call; equal keys share one execution
+            fn: The computation to run
+
+        Returns:
+            The shared result. Waiters receive the same object as the leader,
+            so callers must treat it as read-only.
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._execute(key, fn, args, kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _run(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._stats["executions"] += 1
+        return fn(*args, **kwargs)
+
+    def _execute(self, key: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        if self._lease is None:
+            return self._run(fn, args, kwargs)
+
+        try:
+            deadline = time.time() + self.lease_ttl
+            while True:
+                state, row = self._lease.acquire(key)
+                if state == "leader":
+                    break
+                if state == "done":
+                    with self._lock:
+                        self._stats["coalesced_remote"] += 1
+                    if row[4] is not None:
+                        raise SingleFlightError(row[4])
+                    return json.loads(row[3])
+                if time.time() > deadline:
+                    logger.warning("Single-flight lease wait timed out; computing locally")
+                    return self._run(fn, args, kwargs)
+                time.sleep(self.poll_interval)
+        except sqlite3.Error as e:
+            logger.warning("Single-flight lease unavailable, computing locally: %s", e)
+            return self._run(fn, args, kwargs)
+
+        try:
+            result = self._run(fn, args, kwargs)
+        except Exception as e:
+            self._publish(key, error=str(e) or e.__class__.__name__)
+            raise
+        try:
+            payload = json.dumps(result)
+        except (TypeError, ValueError):
+            self._publish(key, release=True)
+        else:
+            self._publish(key, result=payload)
+        return result
+
+    def _publish(self, key: str, result: Optional[str] = None, error: Optional[str] = None,
+                 release: bool = False):
+        try:
+            if release:
+                self._lease.release(key)
+            else:
+                self._lease.complete(key, result=result, error=error)
+        except sqlite3.Error as e:
+            logger.warning("Failed to publish single-flight result: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters describing how many executions were saved by coalescing"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        stats["saved"] = stats["coalesced"] + stats["coalesced_remote"]
+        stats["cross_worker"] = self._lease is not None
+        return stats
+
+
+# Global single-flight instance; set VIBE_SINGLE_FLIGHT_DB to coalesce across workers
+single_flight = SingleFlight(lease_db_path=os.getenv('VIBE_SINGLE_FLIGHT_DB'))
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Point the module-level stores at a scratch directory before any src module is imported
+_DB_DIR = tempfile.mkdtemp(prefix="vibe-tests-")
+os.environ.setdefault("VIBE_EVENTS_DB", os.path.join(_DB_DIR, "events.db"))
+os.environ.setdefault("VIBE_CONTENT_DB", os.path.join(_DB_DIR, "content.db"))
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
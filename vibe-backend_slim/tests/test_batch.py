@@ -0,0 +1,97 @@
+import pytest
+from flask import Flask, g, jsonify, request
+
+from src.routes import batch as batch_module
+from src.routes.batch import MAX_BATCH_ACTIONS, batch_bp
+from src.routes.realtime import realtime_bp
+
+ECHO_ACTIONS = {
+    "echoHeaders": {"method": "GET", "path": "/test/echo"},
+    "echoBody": {"method": "POST", "path": "/test/echo"},
+    "fail": {"method": "GET", "path": "/test/fail"},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = Flask(__name__)
+    app.register_blueprint(realtime_bp, url_prefix='/api/realtime')
+    app.register_blueprint(batch_bp, url_prefix='/api')
+
+    @app.route('/test/echo', methods=['GET', 'POST'])
+    def echo():
+        # Each dispatched action must see its own g, not the batch request's
+        assert 'marker' not in g
+        g.marker = True
+        return jsonify({
+            'headers': {name: value for name, value in request.headers.items()},
+            'args': request.args.to_dict(),
+            'json': request.get_json(silent=True),
+        })
+
+    @app.route('/test/fail')
+    def fail():
+        return jsonify({'error': 'nope'}), 404
+
+    monkeypatch.setattr(batch_module, 'ACTIONS', dict(batch_module.ACTIONS, **ECHO_ACTIONS))
+    return app.test_client()
+
+
+def test_results_keep_request_order(client):
+    response = client.post('/api/batch', json={'actions': [
+        {'action': 'findNearbyEvents', 'id': 'events', 'args': {'category': 'Music'}},
+        {'action': 'echoBody', 'id': 'body', 'args': {'name': 'value'}},
+        {'action': 'fail', 'id': 'missing'},
+        {'action': 'echoHeaders', 'args': {'q': '1'}},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+
+    assert [result['action'] for result in results] == ['findNearbyEvents', 'echoBody', 'fail', 'echoHeaders']
+    assert [result.get('id') for result in results] == ['events', 'body', 'missing', None]
+    assert [result['status'] for result in results] == [200, 200, 404, 200]
+    assert [result['ok'] for result in results] == [True, True, False, True]
+    assert all(result['durationMs'] >= 0 for result in results)
+    assert all(event['category'] == 'Music' for event in results[0]['body'])
+    assert results[1]['body']['json'] == {'name': 'value'}
+    assert results[3]['body']['args'] == {'q': '1'}
+
+
+def test_single_action_runs_in_its_own_context(client):
+    response = client.post('/api/batch', json={'actions': [{'action': 'echoHeaders'}]})
+    assert response.get_json()['results'][0]['status'] == 200
+
+
+def test_forwarded_headers_exclude_admin_token(client):
+    response = client.post('/api/batch', json={'actions': [{'action': 'echoHeaders'}, {'action': 'echoHeaders'}]},
+                           headers={'Authorization': 'Bearer abc', 'X-Admin-Token': 'secret'})
+    for result in response.get_json()['results']:
+        headers = result['body']['headers']
+        assert headers['Authorization'] == 'Bearer abc'
+        assert 'X-Admin-Token' not in headers
+
+
+@pytest.mark.parametrize("body", [
+    None,
+    {},
+    {'actions': []},
+    {'actions': 'findNearbyEvents'},
+    {'actions': [{'action': 'unknown'}]},
+    {'actions': ['findNearbyEvents']},
+    {'actions': [{'action': 'findNearbyEvents', 'args': ['category']}]},
+    {'actions': [{'action': 'batch'}]},
+])
+def test_invalid_batches_are_rejected(client, body):
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_too_many_actions_are_rejected(client):
+    actions = [{'action': 'echoHeaders'}] * (MAX_BATCH_ACTIONS + 1)
+    response = client.post('/api/batch', json={'actions': actions})
+    assert response.status_code == 400
+
+    response = client.post('/api/batch', json={'actions': actions[:MAX_BATCH_ACTIONS]})
+    assert response.status_code == 200
+    assert len(response.get_json()['results']) == MAX_BATCH_ACTIONS
@@ -0,0 +1,97 @@
+import io
+import math
+
+import pytest
+
+from src.event_store import EventStore
+from src.ingest import DEFAULT_CATEGORY, MAX_BATCH_SIZE, check_batch_size, ingest_stream, iter_ics, normalize_event
+from src.ranking import _price
+
+
+def test_list_category_uses_first_entry():
+    event = normalize_event({"title": "Open Mic", "category": ["music", "Art"]})
+    assert event["category"] == "Music"
+
+
+def test_comma_separated_category_uses_first_entry():
+    event = normalize_event({"title": "Open Mic", "category": "art, music"})
+    assert event["category"] == "Art"
+
+
+def test_missing_category_defaults():
+    event = normalize_event({"title": "Open Mic"})
+    assert event["category"] == DEFAULT_CATEGORY
+
+
+def test_missing_title_is_rejected():
+    assert normalize_event({"category": "Art"}) is None
+    assert normalize_event({}) is None
+
+
+@pytest.mark.parametrize("record", [{}, {"price": None}, {"price": "  "}, {"price": []}])
+def test_missing_price_stays_unknown(record):
+    event = normalize_event(dict(record, title="Open Mic", category="Music"))
+    assert event["price"] is None
+    assert math.isnan(_price(event["price"]))
+
+
+@pytest.mark.parametrize("raw, expected", [(0, "Free"), ("0", "Free"), ("free", "Free"), ("5", "$5"),
+                                           (12.5, "$12.5"), ("$15/child", "$15/child")])
+def test_price_normalization(raw, expected):
+    assert normalize_event({"title": "Open Mic", "category": "Music", "price": raw})["price"] == expected
+
+
+def test_ics_event_without_categories():
+    feed = (
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\n"
+        "UID:evt-1\r\n"
+        "SUMMARY:Farmers Market\\, Downtown\r\n"
+        "DESCRIPTION:Fresh produce from local \r\n"
+        " growers\r\n"
+        "DTSTART;TZID=America/Los_Angeles:20260103T090000\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    events = [normalize_event(record) for record in iter_ics(io.StringIO(feed))]
+    assert len(events) == 1
+    event = events[0]
+    assert event["id"] == "evt-1"
+    assert event["title"] == "Farmers Market, Downtown"
+    assert event["description"] == "Fresh produce from local growers"
+    assert event["category"] == DEFAULT_CATEGORY
+    assert event["time"] == "Saturday, Jan 3"
+    assert event["hour"] == "9:00 AM"
+
+
+def test_derived_ids_are_stable():
+    record = {"title": "Open Mic", "category": "Music", "time": "Friday", "location": "Cafe"}
+    assert normalize_event(dict(record))["id"] == normalize_event(dict(record))["id"]
+
+
+def test_check_batch_size():
+    assert check_batch_size(10) == 10
+    assert check_batch_size(MAX_BATCH_SIZE * 10) == MAX_BATCH_SIZE
+    with pytest.raises(ValueError):
+        check_batch_size(0)
+
+
+def test_ingest_stream_counts_and_skips_unchanged(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    feed = "\n".join([
+        '{"id": "1", "title": "Open Mic", "category": ["Music"], "price": 5}',
+        'not json',
+        '{"category": "Art"}',
+        '{"id": "2", "title": "Sketch Club"}',
+    ])
+
+    stats = ingest_stream(io.StringIO(feed), "jsonl", store=store, batch_size=1)
+    assert (stats["read"], stats["invalid"], stats["written"]) == (4, 2, 2)
+    version = store.version()
+
+    stats = ingest_stream(io.StringIO(feed), "jsonl", store=store)
+    assert (stats["written"], stats["skipped"]) == (0, 2)
+    assert store.version() == version
+
+    with pytest.raises(ValueError):
+        ingest_stream(io.StringIO(feed), "jsonl", store=store, batch_size=0)
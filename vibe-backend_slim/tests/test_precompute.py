@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("openai")
+
+from src.content_store import ContentStore  # noqa: E402
+from src.event_store import EventStore  # noqa: E402
+from src.precompute import DEFAULT_OFF_PEAK_HOURS, PrecomputeScheduler, parse_hours  # noqa: E402
+
+
+class FakeOrchestrator:
+    def __init__(self, inspiration=None, insights=None):
+        self.inspiration = inspiration
+        self.insights = insights or {}
+        self.calls = 0
+
+    def generate_inspiration(self, query):
+        self.calls += 1
+        if self.inspiration is None:
+            raise RuntimeError("upstream failed")
+        return self.inspiration
+
+    def generate_event_insights(self, events):
+        self.calls += 1
+        return {event["id"]: self.insights[event["id"]] for event in events if event["id"] in self.insights}
+
+
+@pytest.fixture
+def stores(tmp_path):
+    events = EventStore(str(tmp_path / "events.db"))
+    events.upsert_many([
+        {"id": "later", "category": "Music", "title": "Later", "startsAt": 4102444800.0},
+        {"id": "undated", "category": "Art", "title": "Undated"},
+        {"id": "past", "category": "Art", "title": "Past", "startsAt": 946684800.0},
+        {"id": "sooner", "category": "Music", "title": "Sooner", "startsAt": 4070908800.0},
+    ])
+    return ContentStore(str(tmp_path / "content.db")), events
+
+
+def test_parse_hours():
+    assert parse_hours("*") is None
+    assert parse_hours("0-6") == set(range(7))
+    assert parse_hours("22-2") == {22, 23, 0, 1, 2}
+    assert parse_hours("5, 13-14") == {5, 13, 14}
+    with pytest.raises(ValueError):
+        parse_hours("night")
+
+
+def test_invalid_off_peak_hours_fall_back(monkeypatch, stores):
+    monkeypatch.setenv("VIBE_PRECOMPUTE_OFFPEAK_HOURS", "night")
+    scheduler = PrecomputeScheduler(FakeOrchestrator(), *stores)
+    assert scheduler.off_peak_hours == parse_hours(DEFAULT_OFF_PEAK_HOURS)
+
+
+def test_upcoming_events_are_enriched_soonest_first(stores):
+    content, events = stores
+    assert [event["id"] for event in events.list_upcoming(limit=10)] == ["sooner", "later", "undated"]
+
+    orchestrator = FakeOrchestrator(insights={"sooner": {"aiInsight": "Go early"}})
+    stats = PrecomputeScheduler(orchestrator, content, events).run_once(force=True)
+    assert stats["event_insight"] == 1
+    assert stats["failed"] == 2
+    assert len(content.fresh_keys("event_insight", 0)) == 1
+
+
+def test_failed_insights_and_queries_are_backed_off(stores):
+    content, events = stores
+    content.record_request("inspire", "board games")
+    orchestrator = FakeOrchestrator()
+    scheduler = PrecomputeScheduler(orchestrator, content, events)
+
+    first = scheduler.run_once(force=True)
+    calls = orchestrator.calls
+    assert first["failed"] == 4  # one query and three upcoming events
+    assert "board games" in content.fresh_keys("inspire_failed", 0)
+
+    second = scheduler.run_once(force=True)
+    assert second["failed"] == 0
+    assert orchestrator.calls == calls
+
+
+def test_budget_stops_the_pass(monkeypatch, stores):
+    monkeypatch.setenv("VIBE_PRECOMPUTE_DAILY_BUDGET_USD", "0.001")
+    content, events = stores
+    stats = PrecomputeScheduler(FakeOrchestrator(), content, events).run_once(force=True)
+    assert stats["budget_exhausted"] is True
+    assert stats["failed"] == 0
@@ -0,0 +1,126 @@
+import math
+import time
+
+import pytest
+
+from src.event_store import EventStore
+from src.ranking import EventFeatures, EventRanker, _distance, _price, _time_slot, parse_preferences
+
+EVENTS = [
+    {"id": "jazz", "category": "Music", "time": "Friday", "hour": "8:00 PM", "title": "Jazz Night",
+     "description": "Live jazz trio", "location": "Blue Note (2 miles)", "price": "$25"},
+    {"id": "yoga", "category": "Fitness", "time": "Saturday", "hour": "7:00 AM", "title": "Sunrise Yoga",
+     "description": "Gentle flow in the park", "location": "Dolores Park (0.5 miles)", "price": "Free"},
+    {"id": "choir", "category": "Music", "time": "Sunday", "hour": "2:00 PM", "title": "Community Choir",
+     "description": "Sing along", "location": "Library (12 miles)", "price": "$10"},
+    {"id": "paint", "category": "Art", "time": "Wednesday", "hour": "18:30", "title": "Paint Night",
+     "description": "Acrylic painting class", "location": "Studio", "price": None},
+]
+
+
+def _features(events=EVENTS):
+    return EventFeatures(events, [(event["id"], "") for event in events])
+
+
+def _ranked(prefs, k=len(EVENTS), category=None):
+    features = _features()
+    return [features.keys[i][0] for i in features.top_k(prefs, k, category)]
+
+
+@pytest.mark.parametrize("hour, slot", [("7:00 AM", 0), ("11:59", 0), ("12:00 PM", 1), ("2:00 PM", 1),
+                                        ("17:00", 2), ("8 pm", 2), ("12:00 AM", 0), ("TBD", -1), (None, -1)])
+def test_time_slot(hour, slot):
+    assert _time_slot(hour) == slot
+
+
+def test_price():
+    assert _price("Free") == 0.0
+    assert _price("$15/child") == 15.0
+    assert _price("$12.50") == 12.5
+    assert math.isnan(_price(None))
+    assert math.isnan(_price("Donation"))
+
+
+def test_distance():
+    assert _distance("Dolores Park (0.5 miles)") == 0.5
+    assert _distance("3 mi away") == 3.0
+    assert math.isnan(_distance("Studio"))
+    assert math.isnan(_distance(None))
+
+
+def test_parse_preferences():
+    prefs = parse_preferences({"interests": "Music, art", "timeOfDay": "evening,midnight", "weekend": "true",
+                               "maxPrice": "20", "maxDistance": "5", "keywords": ["Jazz"]})
+    assert prefs == {"categories": ["music", "art"], "time_slots": ["evening"], "weekend": True,
+                     "max_price": 20.0, "max_distance": 5.0, "keywords": ["jazz"]}
+
+
+@pytest.mark.parametrize("source", [None, {}, {"zip": "94103"}, {"maxPrice": ""}, {"weekend": "no"},
+                                    {"timeOfDay": "midnight"}])
+def test_parse_preferences_without_preferences(source):
+    assert parse_preferences(source) is None
+
+
+@pytest.mark.parametrize("source, key", [({"maxPrice": "0"}, "max_price"), ({"maxDistance": 0}, "max_distance")])
+def test_zero_limits_are_preferences(source, key):
+    assert parse_preferences(source)[key] == 0.0
+
+
+def test_category_preference_ranks_first():
+    ranked = _ranked(parse_preferences({"interests": "music"}))
+    assert set(ranked[:2]) == {"jazz", "choir"}
+
+
+def test_keywords_and_time_of_day():
+    assert _ranked(parse_preferences({"keywords": "painting acrylic"}))[0] == "paint"
+    assert _ranked(parse_preferences({"timeOfDay": "morning"}))[0] == "yoga"
+
+
+def test_free_only_prefers_free_events():
+    assert _ranked(parse_preferences({"maxPrice": "0"}))[0] == "yoga"
+
+
+def test_max_distance_sinks_far_events():
+    ranked = _ranked(parse_preferences({"interests": "music", "maxDistance": "5"}))
+    assert ranked[0] == "jazz"
+    assert ranked[-1] == "choir"
+
+
+def test_top_k_limits_and_filters_by_category():
+    prefs = parse_preferences({"interests": "fitness"})
+    assert _ranked(prefs, k=1) == ["yoga"]
+    assert _ranked(prefs, category="music") == ["jazz", "choir"]
+    assert _ranked(prefs, category="Cooking") == []
+    assert _ranked(prefs, k=0) == []
+
+
+def test_equal_scores_keep_catalog_order():
+    assert _ranked(parse_preferences({"weekend": "1"}), category="Music") == ["choir", "jazz"]
+    assert _ranked(parse_preferences({"keywords": "zzz"})) == ["yoga", "jazz", "choir", "paint"]
+
+
+def test_rank_events_keeps_input_without_preferences():
+    ranker = EventRanker(store=None)
+    assert ranker.rank_events(EVENTS, None) == EVENTS
+    assert [event["id"] for event in ranker.rank_events(EVENTS, parse_preferences({"interests": "art"}))][0] == "paint"
+
+
+def test_rank_catalog_reports_the_version_it_ranked(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    store.upsert_many(EVENTS)
+    ranker = EventRanker(store)
+    prefs = parse_preferences({"interests": "art", "keywords": "pottery"})
+
+    version, keys = ranker.rank_catalog(prefs, 2)
+    assert version == store.version()
+    assert [event_id for event_id, _ in keys] == ["paint", "yoga"]
+
+    store.upsert_many([{"id": "clay", "category": "Art", "title": "Pottery Wheel"}])
+    stale_version, stale_keys = ranker.rank_catalog(prefs, 2)
+    assert (stale_version, stale_keys) == (version, keys)
+
+    deadline = time.time() + 5
+    while ranker.rank_catalog(prefs, 2)[0] != store.version():
+        assert time.time() < deadline, "background rebuild did not finish"
+        time.sleep(0.01)
+    assert [event_id for event_id, _ in ranker.rank_catalog(prefs, 2)[1]] == ["clay", "paint"]
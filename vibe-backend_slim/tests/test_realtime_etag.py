@@ -0,0 +1,61 @@
+import pytest
+from flask import Flask
+
+from src.event_payloads import PAYLOAD_FORMAT_VERSION
+from src.event_store import event_store
+from src.routes.realtime import MOCK_EVENTS, realtime_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(realtime_bp, url_prefix='/api/realtime')
+    return app.test_client()
+
+
+def test_event_list_revalidates_with_etag(client):
+    response = client.get('/api/realtime/events?category=Music')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith(f'"v{PAYLOAD_FORMAT_VERSION}-')
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+    cached = client.get('/api/realtime/events?category=Music', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert cached.data == b''
+
+    other = client.get('/api/realtime/events?category=Art', headers={'If-None-Match': etag})
+    assert other.status_code == 200
+
+
+def test_event_list_etag_changes_with_catalog(client):
+    etag = client.get('/api/realtime/events').headers['ETag']
+
+    changed = dict(MOCK_EVENTS[0], title=MOCK_EVENTS[0]['title'] + ' (updated)')
+    event_store.upsert_many([changed])
+    try:
+        response = client.get('/api/realtime/events', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    finally:
+        event_store.upsert_many([MOCK_EVENTS[0]])
+
+
+def test_event_details_revalidate_with_etag(client):
+    event_id = MOCK_EVENTS[0]['id']
+    response = client.get(f'/api/realtime/events/{event_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    cached = client.get(f'/api/realtime/events/{event_id}', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+    stale = client.get(f'/api/realtime/events/{event_id}', headers={'If-None-Match': '"stale"'})
+    assert stale.status_code == 200
+    assert stale.get_json()['id'] == event_id
+
+
+def test_unknown_event_is_not_found(client):
+    assert client.get('/api/realtime/events/does-not-exist').status_code == 404
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+
+from src.single_flight import SingleFlight, SingleFlightError, _SQLiteLease
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _run_concurrently(flight, fn, waiters=4):
+    """Start a leader, then waiters once the leader is executing; returns per-thread outcomes"""
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            value = flight.do("key", fn)
+        except Exception as e:
+            value = e
+        with lock:
+            outcomes.append(value)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    _wait_for(lambda: flight.stats()["in_flight"] == 1)
+    threads = [threading.Thread(target=call) for _ in range(waiters)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: flight.stats()["coalesced"] == waiters)
+    return [leader] + threads, outcomes
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        gate.wait(5)
+        return {"answer": 42}
+
+    threads, outcomes = _run_concurrently(flight, compute)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(outcomes) == 5
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    stats = flight.stats()
+    assert stats["executions"] == 1
+    assert stats["saved"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_concurrent_calls_share_one_exception():
+    flight = SingleFlight()
+    gate = threading.Event()
+    error = ValueError("upstream failed")
+
+    def compute():
+        gate.wait(5)
+        raise error
+
+    threads, outcomes = _run_concurrently(flight, compute)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(outcomes) == 5
+    assert all(outcome is error for outcome in outcomes)
+    assert flight.stats()["executions"] == 1
+    assert flight.stats()["errors"] == 1
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats()["executions"] == 2
+
+
+def test_make_key_is_order_independent_for_dicts():
+    assert SingleFlight.make_key("idea", {"a": 1, "b": 2}) == SingleFlight.make_key("idea", {"b": 2, "a": 1})
+    assert SingleFlight.make_key("idea", "x") != SingleFlight.make_key("idea", "y")
+
+
+def test_lease_leader_wait_done(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    first = _SQLiteLease(db_path, lease_ttl=60.0, result_ttl=60.0)
+    second = _SQLiteLease(db_path, lease_ttl=60.0, result_ttl=60.0)
+
+    assert first.acquire("key") == ("leader", None)
+    assert second.acquire("key") == ("wait", None)
+
+    first.complete("key", result='{"answer": 42}')
+    state, row = second.acquire("key")
+    assert state == "done"
+    assert row[3] == '{"answer": 42}'
+    assert row[4] is None
+
+
+def test_lease_expired_or_released_lets_another_worker_lead(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    first = _SQLiteLease(db_path, lease_ttl=0.0, result_ttl=60.0)
+    second = _SQLiteLease(db_path, lease_ttl=60.0, result_ttl=60.0)
+
+    assert first.acquire("expired")[0] == "leader"
+    assert second.acquire("expired")[0] == "leader"
+
+    assert second.acquire("released")[0] == "leader"
+    second.release("released")
+    assert first.acquire("released")[0] == "leader"
+
+
+def test_workers_share_result_through_lease(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    leader = SingleFlight(lease_db_path=db_path, result_ttl=60.0)
+    follower = SingleFlight(lease_db_path=db_path, result_ttl=60.0, poll_interval=0.01)
+    gate = threading.Event()
+    results = {}
+
+    def compute():
+        gate.wait(5)
+        return {"answer": 42}
+
+    thread = threading.Thread(target=lambda: results.setdefault("leader", leader.do("key", compute)))
+    thread.start()
+    _wait_for(lambda: leader.stats()["executions"] == 1)
+    follower_thread = threading.Thread(
+        target=lambda: results.setdefault("follower", follower.do("key", pytest.fail))
+    )
+    follower_thread.start()
+    gate.set()
+    thread.join(5)
+    follower_thread.join(5)
+
+    assert results == {"leader": {"answer": 42}, "follower": {"answer": 42}}
+    assert follower.stats()["executions"] == 0
+    assert follower.stats()["coalesced_remote"] == 1
+
+
+def test_leader_error_is_raised_in_other_workers(tmp_path):
+    db_path = str(tmp_path / "leases.db")
+    leader = SingleFlight(lease_db_path=db_path, result_ttl=60.0)
+    follower = SingleFlight(lease_db_path=db_path, result_ttl=60.0)
+
+    def fail():
+        raise RuntimeError("upstream failed")
+
+    with pytest.raises(RuntimeError):
+        leader.do("key", fail)
+    with pytest.raises(SingleFlightError, match="upstream failed"):
+        follower.do("key", pytest.fail)